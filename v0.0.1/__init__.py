@@ -1,2 +1,14 @@
-from .data.k_factors import kfactors
-from .data.periodic_table import PeriodicTableApp
\ No newline at end of file
+from ._lazy import lazy_getattr
+
+# Public names -> submodule, imported on first access so "import CV4EM" stays cheap
+# (the GUI pulls tkinter and pandas, the loaders hyperspy and exspy)
+_EXPORTS = {
+    'kfactors': '.data.k_factors',
+    'PeriodicTableApp': '.data.periodic_table',
+}
+
+def __getattr__(name):
+    return lazy_getattr(__name__, name, _EXPORTS)
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
\ No newline at end of file
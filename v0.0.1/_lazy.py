@@ -0,0 +1,34 @@
+import importlib
+import sys
+
+class LazyModule:
+    """
+    Stand-in for a heavy module, imported on first attribute access:
+        hs = LazyModule('hyperspy.api')   # nothing imported yet
+        hs.signals.Signal2D(data)          # hyperspy.api imported here, once
+    A missing optional dependency only raises ImportError when it is actually used.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule {self._name!r} ({state})>"
+
+def lazy_getattr(package, name, exports):
+    """
+    Module __getattr__ (PEP 562) of a package: imports the submodule exporting 'name' on first access.
+    exports maps public name -> relative submodule, e.g. {'kfactors': '.k_factors'}.
+    The object is then stored in the package namespace, so later lookups do not go through here.
+    """
+    if name not in exports:
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module(exports[name], package), name)
+    sys.modules[package].__dict__[name] = obj
+    return obj
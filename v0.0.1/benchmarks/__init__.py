@@ -0,0 +1 @@
+from .synthetic_EDAX import make_synthetic_EDAX
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Benchmark of HDF5SignalProcessor on synthetic EDAX files.
+
+Every (size, layout, mode) case runs in its own child process, so the peak RSS of one case
+is not hidden by an earlier one. Reported per case: wall time, peak RSS, peak RSS above the
+baseline of the child, and throughput in MB/s of uncompressed SPD data.
+
+Run from the directory that contains the package:
+python -m CV4EM.benchmarks.bench_EDAX_loader --sizes 128x128x1024 256x256x2048 --output results.json
+"""
+import os
+import json
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from .synthetic_EDAX import make_synthetic_EDAX
+
+# on-disk layouts: keyword arguments of make_synthetic_EDAX
+LAYOUTS = {
+    'contiguous': dict(chunks=None),
+    'chunked': dict(chunks=True),
+    'gzip': dict(chunks=True, compression='gzip'),
+}
+
+def _eager(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    HDF5SignalProcessor(file_name)
+
+def _float32(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    HDF5SignalProcessor(file_name, dtype='float32')
+
+def _native(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    HDF5SignalProcessor(file_name, dtype=None)
+
+def _memmap(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    HDF5SignalProcessor(file_name, dtype=None, memmap=True)
+
+def _lazy_sum(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    with HDF5SignalProcessor(file_name, lazy=True) as processor:
+        for signal in processor.get_signals():
+            signal.sum(axis=(0, 1)).compute(show_progressbar=False)
+
+def _stream_reduce(file_name):
+    from ..utils.EDAX_EDS_loader import HDF5SignalProcessor
+    with HDF5SignalProcessor(file_name, lazy=True) as processor:
+        for name in processor.signal_names:
+            processor.reduce_SPD(name)
+
+# loader modes: callable(file_name) doing the work that is timed
+MODES = {
+    'eager': _eager,
+    'float32': _float32,
+    'native': _native,
+    'memmap': _memmap,
+    'lazy_sum': _lazy_sum,
+    'stream_reduce': _stream_reduce,
+}
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # kB on Linux
+
+def _run_case(mode, file_name, queue):
+    # Child process: import first so the baseline includes the libraries, then time the mode.
+    # The loader imports hyperspy, exspy and dask on first use, so they are imported here explicitly.
+    from ..utils import EDAX_EDS_loader
+    import hyperspy.api, exspy, dask.array
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    MODES[mode](file_name)
+    seconds = time.perf_counter() - start
+    peak = _peak_rss_mb()
+    queue.put({'seconds': seconds, 'peak_rss_mb': peak, 'delta_rss_mb': peak - baseline})
+
+def run_case(mode, file_name):
+    # One case in a fresh process (spawn, so nothing of the parent is inherited)
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_case, args=(mode, file_name, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def run_benchmark(sizes=((128, 128, 1024),), layouts=('contiguous', 'chunked', 'gzip'),
+                  modes=('eager', 'float32', 'native', 'memmap', 'lazy_sum', 'stream_reduce'),
+                  repeat=1, workdir=None):
+    """
+    Generate one synthetic file per (size, layout) and time every mode on it.
+    Parameters:
+    - sizes: (rows, columns, channels) of the SPD dataset
+    - layouts: keys of LAYOUTS
+    - modes: keys of MODES
+    - repeat: runs per case, the fastest is kept
+    - workdir: where the synthetic files go (default: a temporary directory, removed afterwards)
+    Returns:
+    - DataFrame with one row per case
+    """
+    rows = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for shape in sizes:
+            for layout in layouts:
+                file_name = os.path.join(tmp, f"{'x'.join(map(str, shape))}_{layout}.h5")
+                make_synthetic_EDAX(file_name, shape=shape, **LAYOUTS[layout])
+                spd_mb = np.prod(shape) * 2 / 2**20 # uint16 counts
+                for mode in modes:
+                    results = [run_case(mode, file_name) for _ in range(repeat)]
+                    best = min(results, key=lambda r: r['seconds'])
+                    rows.append({'shape': 'x'.join(map(str, shape)), 'layout': layout, 'mode': mode,
+                                 'spd_mb': spd_mb, 'file_mb': os.path.getsize(file_name) / 2**20,
+                                 'seconds': best['seconds'], 'mb_per_s': spd_mb / best['seconds'],
+                                 'peak_rss_mb': best['peak_rss_mb'], 'delta_rss_mb': best['delta_rss_mb']})
+                    print(f"{rows[-1]['shape']:>16} {layout:>10} {mode:>14} "
+                          f"{best['seconds']:8.3f} s {rows[-1]['mb_per_s']:9.1f} MB/s "
+                          f"{best['peak_rss_mb']:8.1f} MB peak (+{best['delta_rss_mb']:.1f})")
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark HDF5SignalProcessor on synthetic EDAX files")
+    parser.add_argument('--sizes', nargs='+', default=['128x128x1024'], help="rows x columns x channels, e.g. 256x256x2048")
+    parser.add_argument('--layouts', nargs='+', default=list(LAYOUTS), choices=list(LAYOUTS))
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--workdir', default=None, help="directory for the synthetic files")
+    parser.add_argument('--output', default=None, help="write the results as JSON, to compare runs over time")
+    args = parser.parse_args(argv)
+    sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes]
+    results = run_benchmark(sizes, args.layouts, args.modes, args.repeat, args.workdir)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results.to_dict(orient='records'), f, indent=1)
+    return results
+
+if __name__ == '__main__':
+    main()
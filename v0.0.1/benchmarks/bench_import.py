@@ -0,0 +1,75 @@
+"""
+Cold-start import benchmark: each target is imported in a fresh interpreter, timed, and checked
+against a time budget and a list of heavy modules that must not be loaded at import.
+Exits with status 1 when a budget is exceeded, so it can guard the start-up time in CI.
+
+Run from the directory that contains the package:
+python -m CV4EM.benchmarks.bench_import --budget 0.5 --output import_times.json
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+# module (relative to the package) -> imported as "import CV4EM<module>"
+TARGETS = ['', '.data', '.utils', '.data.k_factors', '.data.xray_lines', '.data.periodic_table',
+           '.utils.EDAX_EDS_loader', '.utils.EDAX_EDS_cache', '.utils.Bruker_EDS',
+           '.utils.EDS_quantification', '.utils.EDS_peak_id', '.utils.NBED_calibration']
+
+# only loaded on first use, never by an import of the package
+HEAVY_MODULES = ['hyperspy', 'exspy', 'pyxem', 'dask', 'pandas', 'tkinter', 'seaborn', 'ipywidgets',
+                 'IPython', 'matplotlib.pyplot']
+
+_CHILD = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def time_import(module, repeat=3):
+    """
+    Fastest of 'repeat' cold imports of module, each in a new interpreter.
+    Returns:
+    - dict with module, seconds and the heavy modules it loaded
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _CHILD.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r['seconds'])
+    return {'module': module, 'seconds': best['seconds'], 'loaded': best['loaded']}
+
+def run_benchmark(targets=TARGETS, budget=0.5, repeat=3):
+    """
+    Returns:
+    - (list of results, True if every import is within budget and loads no heavy module)
+    """
+    package = __package__.rsplit('.', 1)[0]
+    results, ok = [], True
+    for target in targets:
+        result = time_import(package + target, repeat)
+        result['within_budget'] = result['seconds'] <= budget and not result['loaded']
+        ok &= result['within_budget']
+        results.append(result)
+        print(f"{result['module']:>40} {result['seconds'] * 1000:8.1f} ms "
+              f"{'ok' if result['within_budget'] else 'OVER'} {', '.join(result['loaded'])}")
+    return results, ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import times of the package modules")
+    parser.add_argument('--targets', nargs='+', default=TARGETS, help="modules relative to the package, e.g. .utils")
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds allowed per import")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help="write the results as JSON, to compare runs over time")
+    args = parser.parse_args(argv)
+    results, ok = run_benchmark(args.targets, args.budget, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Synthetic EDAX .h5 files with the layout HDF5SignalProcessor reads, so the loader can be
+benchmarked without instrument data.
+
+Each field of view is a group holding:
+- SPD: (rows, columns, channels) counts, Poisson noise on a bremsstrahlung-like background plus Gaussian lines
+- SPC: compound scalar with evPch (eV per channel), KV, LiveTime, BeamCurrent
+- MAPIMAGEIPR: compound scalar with MicronsPerPixelX / MicronsPerPixelY
+- HOSTPARAMS: compound scalar with KV, Magnification, WD, stage position...
+"""
+import h5py
+import numpy as np
+
+# (line energy in keV, relative height) of the lines put in the synthetic spectra
+DEFAULT_LINES = [(0.525, 1.0), (1.740, 0.6), (5.415, 0.8), (5.947, 0.12), (6.404, 1.5), (7.058, 0.2), (7.478, 0.5)]
+
+def synthetic_spectrum(n_channels, ev_pch=10.0, kv=20.0, lines=DEFAULT_LINES, fwhm_ev=130.0):
+    # Mean counts per channel of one pixel
+    energy = (np.arange(n_channels) + 0.5) * ev_pch / 1000 # keV
+    background = np.clip(kv - energy, 0, None) / np.maximum(energy, 0.2) * 0.05 # Kramers-like
+    sigma = fwhm_ev / 1000 / 2.3548
+    peaks = sum(height * np.exp(-0.5 * ((energy - e0) / sigma) ** 2) for e0, height in lines)
+    return background + peaks
+
+def make_synthetic_EDAX(file_name, shape=(256, 256, 2048), n_fields=1, chunks=True, compression=None,
+                        dtype='uint16', ev_pch=10.0, microns_per_pixel=0.05, counts_per_pixel=200, seed=0):
+    """
+    Write a synthetic EDAX .h5 file and return its path.
+    Parameters:
+    - shape: (rows, columns, channels) of each SPD dataset
+    - n_fields: number of fields of view ('Sample 1/Area i/Live Map 1')
+    - chunks: True (one chunk per 16 rows), a chunk shape tuple, or None for contiguous storage
+    - compression: h5py compression, e.g. None, 'gzip', 'lzf'
+    - dtype: on-disk dtype of the counts
+    - ev_pch, microns_per_pixel: calibrations written to SPC and MAPIMAGEIPR
+    - counts_per_pixel: mean total counts of a pixel
+    - seed: random seed, the file content is reproducible
+    """
+    rows, columns, n_channels = shape
+    if chunks is True:
+        chunks = (min(16, rows), columns, n_channels)
+    rng = np.random.default_rng(seed)
+    spectrum = synthetic_spectrum(n_channels, ev_pch)
+    spectrum = spectrum / spectrum.sum() * counts_per_pixel
+    # a smooth intensity variation so element maps are not flat
+    yy, xx = np.mgrid[0:rows, 0:columns]
+    contrast = 0.75 + 0.25 * np.sin(xx / max(columns, 1) * 2 * np.pi) * np.cos(yy / max(rows, 1) * 2 * np.pi)
+
+    spc_dtype = np.dtype([('evPch', '<f4'), ('KV', '<f4'), ('LiveTime', '<f4'), ('BeamCurrent', '<f4')])
+    ipr_dtype = np.dtype([('MicronsPerPixelX', '<f4'), ('MicronsPerPixelY', '<f4')])
+    host_fields = ['StageXPosition', 'StageYPosition', 'StageZPosition', 'Tilt', 'Rotation',
+                   'Magnification', 'WD', 'BeamCurrent', 'KV']
+    host_dtype = np.dtype([(field, '<f4') for field in host_fields])
+
+    with h5py.File(file_name, 'w') as f:
+        for i in range(n_fields):
+            group = f.create_group(f'Sample 1/Area {i + 1}/Live Map 1')
+            spd = group.create_dataset('SPD', shape=shape, dtype=dtype, chunks=chunks, compression=compression)
+            step = chunks[0] if chunks else max(1, (32 * 2**20) // max(columns * n_channels * 8, 1))
+            for r0 in range(0, rows, step): # write by row blocks to keep memory bounded
+                r1 = min(r0 + step, rows)
+                mean = contrast[r0:r1, :, None] * spectrum[None, None, :]
+                spd[r0:r1] = rng.poisson(mean).astype(dtype)
+
+            spc = np.zeros((), dtype=spc_dtype)
+            spc['evPch'], spc['KV'], spc['LiveTime'], spc['BeamCurrent'] = ev_pch, 20.0, 60.0, 1.0
+            group.create_dataset('SPC', data=spc)
+            ipr = np.zeros((), dtype=ipr_dtype)
+            ipr['MicronsPerPixelX'] = ipr['MicronsPerPixelY'] = microns_per_pixel
+            group.create_dataset('MAPIMAGEIPR', data=ipr)
+            host = np.zeros((), dtype=host_dtype)
+            host['KV'], host['Magnification'], host['WD'], host['BeamCurrent'] = 20.0, 5000.0, 10.0, 1.0
+            host['StageXPosition'], host['StageYPosition'] = 1.0 * i, 2.0 * i
+            group.create_dataset('HOSTPARAMS', data=host)
+    return file_name
+"""
+Example use:
+make_synthetic_EDAX('synthetic.h5', shape=(512, 512, 2048), chunks=True, compression='gzip')
+"""
@@ -1,2 +1,13 @@
-from .k_factors import kfactors
-from .periodic_table import PeriodicTableApp
\ No newline at end of file
+from .._lazy import lazy_getattr
+
+_EXPORTS = {
+    'kfactors': '.k_factors',
+    'KFACTOR_REGISTRY': '.k_factors',
+    'PeriodicTableApp': '.periodic_table',
+}
+
+def __getattr__(name):
+    return lazy_getattr(__name__, name, _EXPORTS)
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
\ No newline at end of file
@@ -4,116 +4,319 @@ Latest updated Jan 12th, 2025
 This file contains the k-factors for bruker EDS detector, which is equipped in Hitachi HD2700 STEM
 """
 
-import pandas as pd
+import os
+import csv
+import json
+import threading
 import numpy as np
-import copy
-class kfactors:
+from functools import lru_cache
+
+COLUMN = ['Z', 'Element', 'K','L','M'] # format of the data
+SHELLS = ('K', 'L', 'M')
+KFACTORS_HD2700_DATA = [
+    [1, 'H', 0, 0, 0],[2, 'He', 0, 0, 0],[3, 'Li', 0, 0, 0],[4, 'Be', 181.983, 0, 0],[5, 'B', 8.985, 0, 0],
+    [6, 'C', 11.907, 0, 0], [7, 'N', 3.218, 0, 0],[8, 'O', 1.700, 0, 0],[9, 'F', 1.503, 0, 0],[10, 'Ne', 0.966, 0, 0],
+    [11, 'Na', 0.932, 0, 0], [12, 'Mg', 9.868, 0, 0], [13, 'Al', 11.011, 0, 0], [14, 'Si', 3.596, 0.000, 0.000],
+    [15, 'P', 1.050, 0.000, 0.000],    [16, 'S', 4.296, 0, 0], [17, 'Cl', 1.049, 0, 0], [18, 'Ar', 1.141, 0, 0], [19, 'K', 1.077, 0, 0], [20, 'Ca', 1.157, 92.905, 0], [21, 'Sc', 1.191, 40.965, 0],
+    [22, 'Ti', 1.210, 29.213, 0],  [23, 'V', 1.259, 15.657, 0], [24, 'Cr', 1.278, 7.943, 0],
+    [25, 'Mn', 3.469, 4.798, 0], [26, 'Fe', 2.806, 2.863, 0],
+    [27, 'Co', 1.518, 2.311, 0], [28, 'Ni', 1.556, 1.853, 0],
+    [29, 'Cu', 2.073, 1.677, 0], [30, 'Zn', 1.860, 1.723, 0],
+    [31, 'Ga', 2.070, 2.123, 0], [32, 'Ge', 2.265, 2.054, 0],
+    [33, 'As', 2.481, 2.136, 0], [34, 'Se', 2.807, 2.154, 0],
+    [35, 'Br', 3.078, 2.113, 0], [36, 'Kr', 3.546, 2.263, 0],
+    [37, 'Rb', 4.009, 2.233, 0],[38, 'Sr', 4.616, 2.274, 0.000],
+    [39, 'Y', 5.295, 2.343, 0.000], [40, 'Zr', 6.180, 2.360, 0.000],
+    [41, 'Nb', 7.262, 2.320, 0.000],
+    [42, 'Mo', 8.642, 2.361, 0.000],
+    [43, 'Tc', 10.257, 2.520, 0.000],
+    [44, 'Ru', 12.381, 2.493, 0.000],
+    [45, 'Rh', 14.768, 2.622, 0.000],
+    [46, 'Pd', 17.985, 2.738, 0.000],
+    [47, 'Ag', 21.470, 2.804, 0.000],
+    [48, 'Cd', 26.328, 2.939, 0.000],
+    [49, 'In', 31.736, 2.938, 0.000],
+    [50, 'Sn', 38.849, 3.303, 0.000],
+    [51, 'Sb', 47.074, 3.421, 0.000],
+    [52, 'Te', 58.429, 3.575, 0.000],
+    [53, 'I', 68.682, 3.557, 0.000],
+    [54, 'Xe', 83.757, 3.652, 0.000],
+    [55, 'Cs', 100.587, 3.678, 0.000],
+    [56, 'Ba', 122.888, 3.789, 251.024],
+    [57, 'La', 146.460, 3.779, 36.353],
+    [58, 'Ce', 174.287, 3.779, 21.616],
+    [59, 'Pr', 206.116, 3.772, 16.083],
+    [60, 'Nd', 248.193, 3.835, 12.610],[61, 'Pm', 293.576, 3.847, 9.775],
+    [62, 'Sm', 357.046, 4.036, 9.526],
+    [63, 'Eu', 423.472, 4.054, 7.025],
+    [64, 'Gd', 513.709, 4.178, 3.642],
+    [65, 'Tb', 608.318, 4.188, 5.337],
+    [66, 'Dy', 726.462, 4.229, 4.202],[67, 'Ho', 863.910, 4.297, 3.838],
+    [68, 'Er', 1020.079, 4.322, 3.737],
+    [69, 'Tm', 1203.458, 4.369, 2.699],
+    [70, 'Yb', 1435.566, 4.310, 2.588],
+    [71, 'Lu', 1690.141, 4.565, 1.928],
+    [72, 'Hf', 2008.353, 4.674, 1.839],
+    [73, 'Ta', 2366.031, 4.739, 1.768],
+    [74, 'W', 2793.954, 4.824, 1.740],
+    [75, 'Re', 3280.444, 4.813, 2.310],
+    [76, 'Os', 3894.591, 4.834, 0.734],
+    [77, 'Ir', 4566.981, 4.817, 1.275],
+    [78, 'Pt', 5378.208, 4.893, 1.438],
+    [79, 'Au', 6288.581, 4.892, 1.536],
+    [80, 'Hg', 7434.261, 4.991, 1.950],
+    [81, 'Tl', 8777.332, 5.122, 2.841],
+    [82, 'Pb', 10312.191, 5.257, 3.562],
+    [83, 'Bi', 12054.599, 5.395, 3.445],[84, 'Po', 13950.156, 5.504, 3.495],
+    [85, 'At', 16250.293, 5.628, 3.475],
+    [86, 'Rn', 19882.856, 6.125, 3.419],
+    [87, 'Fr', 23123.224, 6.316, 3.577],
+    [88, 'Ra', 27146.164, 6.580, 3.493],
+    [89, 'Ac', 31583.326, 6.829, 3.390],
+    [90, 'Th', 37429.922, 7.223, 3.269],
+    [91, 'Pa', 43238.079, 7.315, 3.232],
+    [92, 'U', 51724.858, 7.220, 3.198],
+    [93, 'Np', 59588.090, 7.361, 3.125],
+    [94, 'Pu', 71681.625, 7.885, 3.223],
+    [95, 'Am', 83205.325, 8.187, 3.108],
+    [96, 'Cm', 98894.698, 9.382, 3.032],
+    [97, 'Bk', 15703.642, 9.892, 3.018],
+    [98, 'Cf', 37892.321, 10.560, 3.050]
+]
+
+# Module-level lookup structures, built once at import
+SYMBOL_TO_Z = {row[1]: row[0] for row in KFACTORS_HD2700_DATA}
+
+def _table(data):
+    # (max Z + 1, 3) read-only array, row = atomic number, column = K/L/M shell; 0 where no factor.
+    # Every table has at least the rows of SYMBOL_TO_Z, so one line index fits all tables
+    n_rows = max([max(SYMBOL_TO_Z.values())] + [row[0] for row in data]) + 1
+    table = np.zeros((n_rows, len(SHELLS)), dtype=np.float64)
+    for row in data:
+        table[row[0]] = row[2:]
+    table.flags.writeable = False
+    return table
+
+KFACTORS_HD2700 = _table(KFACTORS_HD2700_DATA)
+
+# Standard atomic weights (g/mol) indexed by Z, for weight <-> atomic fractions
+ATOMIC_WEIGHTS = np.array([
+    0, 1.008, 4.0026, 6.94, 9.0122, 10.81, 12.011, 14.007, 15.999, 18.998, 20.180,
+    22.990, 24.305, 26.982, 28.085, 30.974, 32.06, 35.45, 39.948, 39.098, 40.078,
+    44.956, 47.867, 50.942, 51.996, 54.938, 55.845, 58.933, 58.693, 63.546, 65.38,
+    69.723, 72.630, 74.922, 78.971, 79.904, 83.798, 85.468, 87.62, 88.906, 91.224,
+    92.906, 95.95, 98, 101.07, 102.91, 106.42, 107.87, 112.41, 114.82, 118.71,
+    121.76, 127.60, 126.90, 131.29, 132.91, 137.33, 138.91, 140.12, 140.91, 144.24,
+    145, 150.36, 151.96, 157.25, 158.93, 162.50, 164.93, 167.26, 168.93, 173.05,
+    174.97, 178.49, 180.95, 183.84, 186.21, 190.23, 192.22, 195.08, 196.97, 200.59,
+    204.38, 207.2, 208.98, 209, 210, 222, 223, 226, 227, 232.04,
+    231.04, 238.03, 237, 244, 243, 247, 247, 251,
+])
+ATOMIC_WEIGHTS.flags.writeable = False
+
+@lru_cache(maxsize=None)
+def _line_index(x_ray_line):
+    # 'Al_Ka' -> (13, 0): atomic number and shell column
+    element, line = x_ray_line.split('_', 1)
+    try:
+        return SYMBOL_TO_Z[element], SHELLS.index(line[0])
+    except (KeyError, ValueError):
+        raise KeyError(f"No k-factor entry for x-ray line '{x_ray_line}'") from None
+
+@lru_cache(maxsize=256)
+def _flat_index(x_ray_lines, n_shells):
+    index = np.array([z * n_shells + shell for z, shell in map(_line_index, x_ray_lines)], dtype=np.intp)
+    index.flags.writeable = False
+    return index
+
+def line_index(x_ray_lines, table=KFACTORS_HD2700):
+    """
+    Flat indices of the x-ray lines into table.ravel(), cached per line list.
+    :param x_ray_lines: list/tuple of x-ray lines (e.g., ['Al_Ka', 'Zr_Ka'])
+    :return: read-only intp array
+    """
+    return _flat_index(tuple(x_ray_lines), table.shape[1])
+
+def line_atomic_numbers(x_ray_lines):
+    """
+    Atomic numbers of the x-ray lines, e.g. ['Al_Ka', 'O_Ka'] -> array([13, 8]).
+    """
+    return np.array([_line_index(str(line))[0] for line in x_ray_lines], dtype=np.intp)
+
+def lookup_kfactors(x_ray_lines, table=KFACTORS_HD2700, out=None):
+    """
+    Vectorized k-factor lookup: one take on the table for the whole list.
+    :param x_ray_lines: list or string array of x-ray lines, or an integer index array from line_index
+    :param table: (Z, shell) k-factor array (default: the HD2700 Bruker table)
+    :param out: optional float64 array to write into, so repeated lookups allocate nothing
+    :return: array of k-factors
+    """
+    if isinstance(x_ray_lines, np.ndarray) and np.issubdtype(x_ray_lines.dtype, np.integer):
+        index = x_ray_lines
+    else:
+        index = line_index([str(line) for line in x_ray_lines], table)
+    return table.ravel().take(index, out=out)
+
+def _rows_from_records(records):
+    # dicts with COLUMN keys (Z optional) -> [Z, Element, K, L, M] rows
+    rows = []
+    for record in records:
+        element = str(record['Element']).strip()
+        z = int(record['Z']) if record.get('Z') not in (None, '') else SYMBOL_TO_Z[element]
+        rows.append([z, element] + [float(record.get(shell) or 0) for shell in SHELLS])
+    return rows
+
+def read_kfactor_file(file_name):
+    """
+    Parse a k-factor table file into [Z, Element, K, L, M] rows.
+    CSV: a header with Element, K, L, M (Z optional), one element per row.
+    JSON: a list of such records, a list of [Z, Element, K, L, M] rows,
+          or {"columns": [...], "data": [...]} (pandas 'split' layout).
+    """
+    with open(file_name, newline='') as f:
+        if file_name.lower().endswith('.json'):
+            content = json.load(f)
+            if isinstance(content, dict):
+                content = [dict(zip(content['columns'], row)) for row in content['data']]
+            if content and not isinstance(content[0], dict):
+                content = [dict(zip(COLUMN, row)) for row in content]
+            return _rows_from_records(content)
+        return _rows_from_records(csv.DictReader(f))
+
+class KFactorRegistry:
+    """
+    k-factor tables keyed by (instrument, detector). A table is registered as rows or as a
+    CSV/JSON file, parsed into the compact (Z, shell) array on first use and then kept for the
+    life of the process, so later lookups never rebuild it.
+    """
     def __init__(self):
-        self.column = ['Z', 'Element', 'K','L','M'] # format of the data
-        self.data = [
-                        [1, 'H', 0, 0, 0],[2, 'He', 0, 0, 0],[3, 'Li', 0, 0, 0],[4, 'Be', 181.983, 0, 0],[5, 'B', 8.985, 0, 0],
-                        [6, 'C', 11.907, 0, 0], [7, 'N', 3.218, 0, 0],[8, 'O', 1.700, 0, 0],[9, 'F', 1.503, 0, 0],[10, 'Ne', 0.966, 0, 0],
-                        [11, 'Na', 0.932, 0, 0], [12, 'Mg', 9.868, 0, 0], [13, 'Al', 11.011, 0, 0], [14, 'Si', 3.596, 0.000, 0.000],
-                        [15, 'P', 1.050, 0.000, 0.000],    [16, 'S', 4.296, 0, 0], [17, 'Cl', 1.049, 0, 0], [18, 'Ar', 1.141, 0, 0], [19, 'K', 1.077, 0, 0], [20, 'Ca', 1.157, 92.905, 0], [21, 'Sc', 1.191, 40.965, 0],
-                        [22, 'Ti', 1.210, 29.213, 0],  [23, 'V', 1.259, 15.657, 0], [24, 'Cr', 1.278, 7.943, 0],
-                        [25, 'Mn', 3.469, 4.798, 0], [26, 'Fe', 2.806, 2.863, 0],
-                        [27, 'Co', 1.518, 2.311, 0], [28, 'Ni', 1.556, 1.853, 0],
-                        [29, 'Cu', 2.073, 1.677, 0], [30, 'Zn', 1.860, 1.723, 0],
-                        [31, 'Ga', 2.070, 2.123, 0], [32, 'Ge', 2.265, 2.054, 0],
-                        [33, 'As', 2.481, 2.136, 0], [34, 'Se', 2.807, 2.154, 0],
-                        [35, 'Br', 3.078, 2.113, 0], [36, 'Kr', 3.546, 2.263, 0],
-                        [37, 'Rb', 4.009, 2.233, 0],[38, 'Sr', 4.616, 2.274, 0.000],
-                        [39, 'Y', 5.295, 2.343, 0.000], [40, 'Zr', 6.180, 2.360, 0.000],
-                        [41, 'Nb', 7.262, 2.320, 0.000],
-                        [42, 'Mo', 8.642, 2.361, 0.000],
-                        [43, 'Tc', 10.257, 2.520, 0.000],
-                        [44, 'Ru', 12.381, 2.493, 0.000],
-                        [45, 'Rh', 14.768, 2.622, 0.000],
-                        [46, 'Pd', 17.985, 2.738, 0.000],
-                        [47, 'Ag', 21.470, 2.804, 0.000],
-                        [48, 'Cd', 26.328, 2.939, 0.000],
-                        [49, 'In', 31.736, 2.938, 0.000],
-                        [50, 'Sn', 38.849, 3.303, 0.000],
-                        [51, 'Sb', 47.074, 3.421, 0.000],
-                        [52, 'Te', 58.429, 3.575, 0.000],
-                        [53, 'I', 68.682, 3.557, 0.000],
-                        [54, 'Xe', 83.757, 3.652, 0.000],
-                        [55, 'Cs', 100.587, 3.678, 0.000],
-                        [56, 'Ba', 122.888, 3.789, 251.024],
-                        [57, 'La', 146.460, 3.779, 36.353],
-                        [58, 'Ce', 174.287, 3.779, 21.616],
-                        [59, 'Pr', 206.116, 3.772, 16.083],
-                        [60, 'Nd', 248.193, 3.835, 12.610],[61, 'Pm', 293.576, 3.847, 9.775],
-                        [62, 'Sm', 357.046, 4.036, 9.526],
-                        [63, 'Eu', 423.472, 4.054, 7.025],
-                        [64, 'Gd', 513.709, 4.178, 3.642],
-                        [65, 'Tb', 608.318, 4.188, 5.337],
-                        [66, 'Dy', 726.462, 4.229, 4.202],[67, 'Ho', 863.910, 4.297, 3.838],
-                        [68, 'Er', 1020.079, 4.322, 3.737],
-                        [69, 'Tm', 1203.458, 4.369, 2.699],
-                        [70, 'Yb', 1435.566, 4.310, 2.588],
-                        [71, 'Lu', 1690.141, 4.565, 1.928],
-                        [72, 'Hf', 2008.353, 4.674, 1.839],
-                        [73, 'Ta', 2366.031, 4.739, 1.768],
-                        [74, 'W', 2793.954, 4.824, 1.740],
-                        [75, 'Re', 3280.444, 4.813, 2.310],
-                        [76, 'Os', 3894.591, 4.834, 0.734],
-                        [77, 'Ir', 4566.981, 4.817, 1.275],
-                        [78, 'Pt', 5378.208, 4.893, 1.438],
-                        [79, 'Au', 6288.581, 4.892, 1.536],
-                        [80, 'Hg', 7434.261, 4.991, 1.950],
-                        [81, 'Tl', 8777.332, 5.122, 2.841],
-                        [82, 'Pb', 10312.191, 5.257, 3.562],
-                        [83, 'Bi', 12054.599, 5.395, 3.445],[84, 'Po', 13950.156, 5.504, 3.495],
-                        [85, 'At', 16250.293, 5.628, 3.475],
-                        [86, 'Rn', 19882.856, 6.125, 3.419],
-                        [87, 'Fr', 23123.224, 6.316, 3.577],
-                        [88, 'Ra', 27146.164, 6.580, 3.493],
-                        [89, 'Ac', 31583.326, 6.829, 3.390],
-                        [90, 'Th', 37429.922, 7.223, 3.269],
-                        [91, 'Pa', 43238.079, 7.315, 3.232],
-                        [92, 'U', 51724.858, 7.220, 3.198],
-                        [93, 'Np', 59588.090, 7.361, 3.125],
-                        [94, 'Pu', 71681.625, 7.885, 3.223],
-                        [95, 'Am', 83205.325, 8.187, 3.108],
-                        [96, 'Cm', 98894.698, 9.382, 3.032],
-                        [97, 'Bk', 15703.642, 9.892, 3.018],
-                        [98, 'Cf', 37892.321, 10.560, 3.050]
-                    ]
-        self.kfactors_HD2700 = pd.DataFrame(data = data,df=None, columns = column)
-    def find_kfactors(self,x_rayline_list, index='Element'):
+        self.sources = {} # (instrument, detector) -> rows or file name
+        self.tables = {} # (instrument, detector) -> read-only (Z, shell) array
+        self.lock = threading.Lock()
+
+    def register(self, instrument, detector, source):
+        """
+        Parameters:
+        - source: path of a CSV/JSON file (see read_kfactor_file) or a list of [Z, Element, K, L, M] rows
+        """
+        key = (instrument, detector)
+        with self.lock:
+            self.sources[key] = source
+            self.tables.pop(key, None) # re-registering replaces the cached table
+
+    def register_dir(self, directory):
+        """
+        Register every <instrument>_<detector>.csv/.json file of a directory.
+        """
+        for name in sorted(os.listdir(directory)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in ('.csv', '.json') and '_' in stem:
+                instrument, detector = stem.split('_', 1)
+                self.register(instrument, detector, os.path.join(directory, name))
+
+    def keys(self):
+        return list(self.sources)
+
+    def rows(self, instrument='HD2700', detector='Bruker'):
+        """
+        [Z, Element, K, L, M] rows of a registered table (the file is read on each call).
+        """
+        key = (instrument, detector)
+        if key not in self.sources:
+            raise KeyError(f"No k-factor table registered for {key}, known: {self.keys()}")
+        source = self.sources[key]
+        return read_kfactor_file(source) if isinstance(source, str) else source
+
+    def table(self, instrument='HD2700', detector='Bruker'):
+        key = (instrument, detector)
+        table = self.tables.get(key)
+        if table is None:
+            with self.lock:
+                table = self.tables.get(key)
+                if table is None:
+                    table = self.tables[key] = _table(self.rows(instrument, detector))
+        return table
+
+    def lookup(self, x_ray_lines, instrument='HD2700', detector='Bruker', out=None):
+        """
+        k-factors of the lines in one (instrument, detector) table, see lookup_kfactors.
+        """
+        return lookup_kfactors(x_ray_lines, self.table(instrument, detector), out=out)
+
+    def lookup_many(self, x_ray_lines, instruments):
+        """
+        k-factors for many lines across instruments in one call.
+        Parameters:
+        - x_ray_lines: list of lines, e.g. ['Al_Ka', 'O_Ka', 'Al_Ka']
+        - instruments: one (instrument, detector) per line, or a single key for all lines
+        Returns:
+        - float64 array in line order
+        """
+        if len(instruments) and isinstance(instruments[0], str): # ('HD2700', 'Bruker'), not a key per line
+            return self.lookup(x_ray_lines, *instruments)
+        if len(instruments) != len(x_ray_lines):
+            raise ValueError(f"{len(instruments)} (instrument, detector) keys for {len(x_ray_lines)} x-ray lines")
+        groups = {} # (instrument, detector) -> positions of its lines
+        for i, key in enumerate(instruments):
+            groups.setdefault(tuple(key), []).append(i)
+        out = np.empty(len(x_ray_lines), dtype=np.float64)
+        for key, where in groups.items(): # one take per table
+            out[where] = self.lookup(tuple(x_ray_lines[i] for i in where), *key)
+        return out
+
+# Process-wide registry, with the built-in Bruker detector of the Hitachi HD2700
+KFACTOR_REGISTRY = KFactorRegistry()
+KFACTOR_REGISTRY.register('HD2700', 'Bruker', KFACTORS_HD2700_DATA)
+KFACTOR_REGISTRY.tables[('HD2700', 'Bruker')] = KFACTORS_HD2700
+
+class kfactors:
+    def __init__(self, instrument='HD2700', detector='Bruker'):
+        self.column = COLUMN
+        self.instrument = instrument
+        self.detector = detector
+        self.table = KFACTOR_REGISTRY.table(instrument, detector) # shared, parsed once per process
+
+    @property
+    def data(self):
+        # [Z, Element, K, L, M] rows of this instrument and detector
+        return KFACTOR_REGISTRY.rows(self.instrument, self.detector)
+
+    @property
+    def kfactors_HD2700(self):
+        # DataFrame view of the data of this instrument and detector (the name predates the registry),
+        # only built when asked for
+        import pandas as pd
+        return pd.DataFrame(data = self.data, columns = self.column)
+
+    def find_kfactors(self,x_rayline_list, df=None, index='Element'):
         """
         Find the k-factor for the given x-ray line list.
-        :param x_rayline_list: List of x-ray lines (e.g., ['Al_Ka', 'Zr_Ka'])
-        :param df: DataFrame to search (defaults to self.kfactors_2700, might use our other facilities if vendor can provide their kfactors)
-        :param index: Index column for searching (default is 'Element')
+        :param x_rayline_list: List of x-ray lines (e.g., ['Al_Ka', 'Zr_Ka']), or an exspy EDS spectrum
+        :param df: DataFrame to search (defaults to the registered table of this instrument and detector, might use our other facilities if vendor can provide their kfactors)
+        :param index: Index column for searching df (default is 'Element')
         :return: List of k-factors
         """
-        
-        data_list = []
-        if df is None:
-            df = copy.deepcopy(self.kfactors_HD2700)
-        df.set_index(index, inplace=True)  # Set index to 'Element'
-        if isinstance(x_rayline_list, (list, np.ndarray)):
+        if isinstance(x_rayline_list, (list, tuple, np.ndarray)):
             EDS_lines = x_rayline_list
-
-        elif isinstance(x_rayline_list, (exspy.signals.eds_tem.EDSTEMSpectrum,
-                                exspy.signals.eds_sem.EDSSEMSpectrum)):
+        elif hasattr(x_rayline_list, 'metadata'): # exspy EDSTEMSpectrum / EDSSEMSpectrum
             EDS_lines = x_rayline_list.metadata.Sample.xray_lines
         else:
-            print (f"Please assign x-rayline_list values with a list format: [element1_K(or L or M)a','element2_K(or L or M)a'... ]")
-        for item in EDS_lines:
-            # Extract index and line
-            idx = item.split('_')[0]  # Extract index before underscore
-            line = item[-2]  # Extract last two characters as line
-            # Access value from DataFrame
-            value = df.at[idx, line]
-            data_list.append(value)
-        return data_list
+            raise TypeError("Please assign x-rayline_list values with a list format: [element1_K(or L or M)a','element2_K(or L or M)a'... ]")
+        if df is None:
+            return lookup_kfactors([str(line) for line in EDS_lines], self.table).tolist()
+        df = df.set_index(index)
+        return [df.at[item.split('_')[0], item.split('_')[1][0]] for item in EDS_lines]
 """
 Example usage:
 kfactor = kfactors()
-results = kfactors.find_kfactors(x_rayline_list =['Al_Ka', 'Zr_Ka', 'O_Ka', 'Ti_Ka'],  index = 'Element')
+results = kfactor.find_kfactors(x_rayline_list =['Al_Ka', 'Zr_Ka', 'O_Ka', 'Ti_Ka'])
 the result will display like this:
->>>>[11.011, 1.7, 1.21, 6.18] where 11.011 is k_factor of Ka peak for Al, 1.7 is for 'Zr_Ka'....
+>>>>[11.011, 6.18, 1.7, 1.21] where 11.011 is k_factor of Ka peak for Al, 6.18 is for 'Zr_Ka'....
+For many lines at once, as an array:
+index = line_index(['Al_Ka', 'Zr_Ka'])     # cached, compute once
+values = lookup_kfactors(index, out=buffer) # no allocation
+Other instruments:
+KFACTOR_REGISTRY.register('Talos', 'SuperX', 'kfactors_Talos_SuperX.csv')  # parsed on first use
+kfactors('Talos', 'SuperX').find_kfactors(['Al_Ka'])
+KFACTOR_REGISTRY.lookup_many(['Al_Ka', 'Al_Ka'], [('HD2700', 'Bruker'), ('Talos', 'SuperX')])
 """
\ No newline at end of file
@@ -1,6 +1,10 @@
-import tkinter as tk
-import pandas as pd
 import numpy as np
+from .._lazy import LazyModule
+from .xray_lines import X_RAY_ENERGIES, LINE_NAMES
+
+# GUI and table dependencies, imported when a PeriodicTableApp is built
+tk = LazyModule('tkinter')
+pd = LazyModule('pandas')
 """
 cv4em.periodic_table
 ~~~~~~~~~~~~~~~~~~~~
@@ -185,107 +189,9 @@ class PeriodicTableApp:
             {"Symbol": "Og", "Name": "Oganesson", "AtomicNumber": 118, "Row": 6, "Column": 17, "Category": "Noble Gas"},
         ]
         self.df_elements = pd.DataFrame(data = self.elements)
-        self.x_ray_energies = {
-            "Li": [54.3, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Be": [108.5, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "B": [183.3, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "C": [277, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "N": [392.4, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "O": [524.9, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "F": [676.8, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Ne": [848.6, 848.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Na": [1040.98, 1040.98, 1071.1, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Mg": [1253.60, 1253.60, 1302.2, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Al": [1486.70, 1486.27, 1557.45, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Si": [1739.98, 1739.38, 1835.94, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "P": [2013.7, 2012.7, 2139.1, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "S": [2307.84, 2306.64, 2464.04, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Cl": [2622.39, 2620.78, 2815.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Ar": [2957.70, 2955.63, 3190.5, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "K": [3313.8, 3311.1, 3589.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Ca": [3691.68, 3688.09, 4012.7, 341.3, 341.3, 344.9, np.nan, np.nan, np.nan],
-            "Sc": [4090.6, 4086.1, 4460.5, 395.4, 395.4, 399.6, np.nan, np.nan, np.nan],
-
-            "Ti": [4510.84, 4504.86, 4931.81, 452.2, 452.2, 458.4, np.nan, np.nan, np.nan],
-            "V": [4952.20, 4944.64, 5427.29, 511.3, 511.3, 519.2, np.nan, np.nan, np.nan],
-            "Cr": [5414.72, 5405.509, 5946.71, 572.8, 572.8, 582.8, np.nan, np.nan, np.nan],
-            "Mn": [5898.75, 5887.65, 6490.45, 637.4, 637.4, 648.8, np.nan, np.nan, np.nan],
-            "Fe": [6403.84, 6390.84, 7057.98, 705.0, 705.0, 718.5, np.nan, np.nan, np.nan],
-            "Co": [6930.32, 6915.30, 7649.43, 776.2, 776.2, 791.4, np.nan, np.nan, np.nan],
-            "Ni": [7478.15, 7460.89, 8264.66, 851.5, 851.5, 868.8, np.nan, np.nan, np.nan],
-            "Cu": [8047.78, 8027.83, 8905.29, 929.7, 929.7, 949.8, np.nan, np.nan, np.nan],
-            "Zn": [8638.66, 8615.78, 9572.0, 1011.7, 1011.7, 1034.7, np.nan, np.nan, np.nan],
-            "Ga": [9251.74, 9224.82, 10264.2, 1097.92, 1097.92, 1124.8, np.nan, np.nan, np.nan],
-            "Ge": [9886.42, 9855.32, 10982.1, 1188.00, 1188.00, 1218.5, np.nan, np.nan, np.nan],
-            "As": [10543.72, 10507.99, 11726.2, 1282.00, 1282.00, 1317.0, np.nan, np.nan, np.nan],
-            "Se": [11222.4, 11181.4, 12495.9, 1379.10, 1379.10, 1419.23, np.nan, np.nan, np.nan],
-            "Br": [11924.2, 11877.6, 13291.4, 1480.43, 1480.43, 1525.90, np.nan, np.nan, np.nan],
-            "Kr": [12649, 12598, 14112, 1586.0, 1586.0, 1636.6, np.nan, np.nan, np.nan],
-            "Rb": [13395.3, 13335.8, 14961.3, 1694.13, 1692.56, 1752.17, np.nan, np.nan, np.nan],
-            "Sr": [14165, 14097.9, 15835.7, 1806.56, 1804.74, 1871.72, np.nan, np.nan, np.nan],
-            "Y": [14958.4, 14882.9, 16737.8, 1922.56, 1920.47, 1995.84, np.nan, np.nan, np.nan],
-            "Zr": [15775.1, 15690.9, 17667.8, 2042.36, 2039.9, 2124.4, 2219.4, 2302.7, np.nan],
-            
-            "Nb": [16615.1, 16521.0, 18622.5, 2165.89, 2163.0, 2257.4, 2367.0, 2461.8, np.nan],
-            "Mo": [17479.34, 17374.3, 19608.3, 2293.16, 2289.85, 2394.81, 2518.3, 2623.5, np.nan],
-            "Tc": [18367.1, 18250.8, 20619.0, 2424.0, 2420.0, 2538.0, 2674.0, 2792.0, np.nan],
-            "Ru": [19279.2, 19150.4, 21656.8, 2558.55, 2554.31, 2683.23, 2836.0, 2964.5, np.nan],
-            "Rh": [20216.1, 20073.7, 22723.6, 2696.74, 2692.05, 2834.41, 3001.3, 3143.8, np.nan],
-            "Pd": [21177.1, 21020.1, 23818.7, 2838.61, 2833.29, 2990.22, 3171.79, 3328.7, np.nan],
-            "Ag": [22162.92, 21990.3, 24942.4, 2984.31, 2978.21, 3150.94, 3347.81, 3519.59, np.nan],
-            "Cd": [23173.6, 22984.1, 26095.5, 3133.73, 3126.91, 3316.57, 3528.12, 3716.86, np.nan],
-            "In": [24209.7, 24002.0, 27275.9, 3286.94, 3279.29, 3487.21, 3713.81, 3920.81, np.nan],
-            "Sn": [25271.3, 25044.0, 28486.0, 3443.93, 3435.42, 3662.80, 3904.86, 4131.12, np.nan],
-            "Sb": [26359.1, 26110.8, 29725.6, 3604.72, 3595.32, 3843.57, 4100.78, 4347.79, np.nan],
-            "Te": [27472.4, 27201.7, 30995.7, 3769.33, 3758.8, 4029.58, 4301.7, 4570.9, np.nan],
-            "I": [28612.0, 28317.2, 32294.7, 3937.65, 3926.04, 4209.58, 4507.5, 4800.9, np.nan],
-            "Xe": [29779.0, 29458.0, 33624.0, 4109.9, np.nan, np.nan, np.nan, np.nan, np.nan],
-            "Cs": [30972.8, 30625.1, 34986.9, 4286.5, 4272.2, 4619.8, 4935.9, 5280.4, np.nan],
-            "Ba": [32193.6, 31817.1, 36378.2, 4466.26, 4450.9, 4827.53, 5156.5, 5531.1, np.nan],
-            "La": [33441.8, 33034.1, 37801.0, 4650.97, 4634.23, 5042.1, 5383.5, 5788.5, 833.0],
-            "Ce": [34719.7, 34278.9, 39257.3, 4840.2, 4823.0, 5262.2, 5613.4, 6052.0, 883.0],
-            "Pr": [36026.3, 35550.2, 40748.3, 5037.7, 5013.5, 5488.9, 5850.0, 6322.1, 929.0],
-            "Nd": [37361.0, 36847.4, 42271.3, 5236.6, 5207.7, 5721.6, 6089.4, 6602.1, 978.0],
-            "Pm": [38724.7, 38171.2, 43826.0, 5432.5, 5407.8, 5961.0, 6339.0, 6892.0, np.nan],
-            "Sm": [40118.1, 39522.4, 45413.0, 5636.1, 5609.0, 6205.1, 6586.0, 7178.0, 1081.0],
-
-            "Eu": [41542.2, 40901.9, 47037.9, 5845.7, 5816.6, 6456.4, 6843.2, 7480.3, 1131.0],
-            "Gd": [42996.2, 42308.9, 48697.0, 6057.2, 6025.0, 6713.2, 7102.8, 7785.8, 1185.0],
-            "Tb": [44481.6, 43744.1, 50382.0, 6272.8, 6238.0, 6978.0, 7366.7, 8102.0, 1240.0],
-            "Dy": [45998.4, 45207.8, 52119.0, 6495.2, 6457.7, 7247.7, 7635.7, 8418.8, 1293.0],
-            "Ho": [47546.7, 46699.7, 53877.0, 6719.8, 6679.5, 7525.3, 7911.0, 8747.0, 1348.0],
-            "Er": [49127.7, 48221.1, 55681.0, 6948.7, 6905.0, 7810.9, 8189.0, 9089.0, 1406.0],
-            "Tm": [50741.6, 49772.6, 57517.0, 7179.9, 7133.1, 8101.0, 8468.0, 9426.0, 1462.0],
-            "Yb": [52388.9, 51354.0, 59370.0, 7415.6, 7367.3, 8401.8, 8758.8, 9780.1, 1521.4],
-            "Lu": [54069.8, 52965.0, 61283.0, 7655.5, 7604.9, 8709.0, 9048.9, 10143.4, 1581.3],
-            "Hf": [55790.2, 54611.4, 63234.0, 7899.0, 7844.6, 9022.7, 9347.3, 10515.8, 1644.6],
-            "Ta": [57532.0, 56277.0, 65223.0, 8146.1, 8087.9, 9343.1, 9651.8, 10895.2, 1710.0],
-            "W": [59318.24, 57981.7, 67244.3, 8397.6, 8335.3, 9672.35, 9961.5, 11285.9, 1775.4],
-            "Re": [61140.3, 59717.9, 69310.0, 8652.5, 8586.2, 10010.0, 10275.2, 11685.4, 1842.5],
-            "Os": [63000.5, 61486.7, 71413.0, 8911.7, 8841.0, 10355.3, 10598.5, 12095.3, 1910.2],
-            "Ir": [64995.6, 63286.7, 73560.8, 9175.1, 9099.5, 10708.3, 10920.3, 12512.6, 1979.9],
-            "Pt": [66832.0, 65112.0, 75748.0, 9442.3, 9361.8, 11070.7, 11250.5, 12942.0, 2050.5],
-            "Au": [68803.7, 66995.9, 77948.0, 9718.4, 9628.0, 11407.0, 11584.7, 13381.4, 2122.9],
-            "Hg": [70819.0, 68895.0, 80253.0, 9988.8, 9897.6, 11822.6, 11924.1, 13830.1, 2195.3],
-            "Tl": [72871.5, 70831.9, 82576.0, 10268.5, 10172.8, 12213.3, 12271.5, 14291.5, 2270.6],
-
-                "Pb": [74969.4, 72804.2, 84936.0, 10551.5, 10449.5, 12613.7, 12622.6, 14764.4, 2345.5],
-            "Bi": [77107.9, 74814.8, 87343.0, 10838.8, 10730.91, 13023.5, 12979.9, 15247.7, 2422.6],
-            "Po": [79290.0, 76862.0, 89800.0, 11130.8, 11015.8, 13447.0, 13340.4, 15744.0, np.nan],
-            "At": [81520.0, 78950.0, 92300.0, 11426.8, 11304.8, 13876.0, np.nan, 16251.0, np.nan],
-            "Rn": [83780.0, 81070.0, 94870.0, 11727.0, 11597.9, 14316.0, np.nan, 16770.0, np.nan],
-            "Fr": [86100.0, 83230.0, 97470.0, 12031.3, 11895.0, 14770.0, 14450.0, 17303.0, np.nan],
-            "Ra": [88470.0, 85430.0, 100130.0, 12339.7, 12196.2, 15325.8, 14841.4, 17849.0, np.nan],
-            "Ac": [90884.0, 87670.0, 102850.0, 12652.0, 12500.8, 15713.0, np.nan, 18408.0, np.nan],
-            "Th": [93350.0, 89953.0, 105609.0, 12968.7, 12809.6, 16202.2, 15623.7, 18982.5, 2996.1],
-            "Pa": [95868.0, 92287.0, 108427.0, 13290.7, 13122.2, 16702.0, 16024.0, 19568.0, 3082.3],
-            "U": [98439.0, 94665.0, 111300.0, 13614.7, 13438.8, 17220.0, 16428.3, 20167.1, 3170.8],
-            "Np": [np.nan, np.nan, np.nan, 13944.1, 13759.7, 17750.2, 16840.0, 20784.8, np.nan],
-            "Pu": [np.nan, np.nan, np.nan, 14278.6, 14084.2, 18293.7, 17255.3, 21417.3, np.nan],
-            "Am": [np.nan, np.nan, np.nan, 14617.2, 14411.9, 18852.0, 17676.5, 22065.2, np.nan]
-        }
+        self.x_ray_energies = X_RAY_ENERGIES
         self.df_xray_energies = pd.DataFrame(self.x_ray_energies).T
-        self.df_xray_energies.columns = ["Ka", "Ka2", "Kb1", "La", "La2", "Lb1", "Lb2", "Ly1", "Ma"]
+        self.df_xray_energies.columns = list(LINE_NAMES)
         self.selected_elements = []
         self.xray_lines = []
         self.xray_lines_display = []
@@ -0,0 +1,294 @@
+import numpy as np
+from functools import lru_cache
+"""
+cv4em.xray_lines
+~~~~~~~~~~~~~~~~
+
+X-ray emission line energies (eV) of the elements, without any GUI: the table used by
+PeriodicTableApp, and a sorted index of every (element, line, energy) entry that answers
+"which lines lie within +/- tolerance of E" by binary search, for one energy or thousands at once.
+Only NumPy is needed (no tkinter, no pandas).
+"""
+# Lowest FWHM (eV) fwhm_at_energy returns: the linear Fano model goes to zero (then NaN) at low
+# energy for detectors better than ~121 eV at Mn Ka, where the electronic noise really dominates
+MIN_FWHM = 20.0
+
+def fwhm_at_energy(energy, energy_resolution_MnKa=130.0):
+    """
+    Detector FWHM (keV) at 'energy' (keV, scalar or array), scaled from the resolution at Mn Ka (eV)
+    with the usual Fano/noise model, FWHM^2 = FWHM_MnKa^2 + 2.5 eV * (E - E_MnKa), and never below
+    MIN_FWHM.
+    """
+    energy = np.asarray(energy, dtype=np.float64)
+    squared = energy_resolution_MnKa ** 2 + 2.5 * (energy - 5.8987) * 1000
+    return np.sqrt(np.maximum(squared, MIN_FWHM ** 2)) / 1000
+
+# Line of each column of X_RAY_ENERGIES
+LINE_NAMES = ("Ka", "Ka2", "Kb1", "La", "La2", "Lb1", "Lb2", "Ly1", "Ma")
+
+# element -> energies in eV, in LINE_NAMES order, nan where the line is not tabulated
+X_RAY_ENERGIES = {
+    "Li": [54.3, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Be": [108.5, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "B": [183.3, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "C": [277, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "N": [392.4, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "O": [524.9, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "F": [676.8, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Ne": [848.6, 848.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Na": [1040.98, 1040.98, 1071.1, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Mg": [1253.60, 1253.60, 1302.2, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Al": [1486.70, 1486.27, 1557.45, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Si": [1739.98, 1739.38, 1835.94, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "P": [2013.7, 2012.7, 2139.1, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "S": [2307.84, 2306.64, 2464.04, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Cl": [2622.39, 2620.78, 2815.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Ar": [2957.70, 2955.63, 3190.5, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "K": [3313.8, 3311.1, 3589.6, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Ca": [3691.68, 3688.09, 4012.7, 341.3, 341.3, 344.9, np.nan, np.nan, np.nan],
+    "Sc": [4090.6, 4086.1, 4460.5, 395.4, 395.4, 399.6, np.nan, np.nan, np.nan],
+
+    "Ti": [4510.84, 4504.86, 4931.81, 452.2, 452.2, 458.4, np.nan, np.nan, np.nan],
+    "V": [4952.20, 4944.64, 5427.29, 511.3, 511.3, 519.2, np.nan, np.nan, np.nan],
+    "Cr": [5414.72, 5405.509, 5946.71, 572.8, 572.8, 582.8, np.nan, np.nan, np.nan],
+    "Mn": [5898.75, 5887.65, 6490.45, 637.4, 637.4, 648.8, np.nan, np.nan, np.nan],
+    "Fe": [6403.84, 6390.84, 7057.98, 705.0, 705.0, 718.5, np.nan, np.nan, np.nan],
+    "Co": [6930.32, 6915.30, 7649.43, 776.2, 776.2, 791.4, np.nan, np.nan, np.nan],
+    "Ni": [7478.15, 7460.89, 8264.66, 851.5, 851.5, 868.8, np.nan, np.nan, np.nan],
+    "Cu": [8047.78, 8027.83, 8905.29, 929.7, 929.7, 949.8, np.nan, np.nan, np.nan],
+    "Zn": [8638.66, 8615.78, 9572.0, 1011.7, 1011.7, 1034.7, np.nan, np.nan, np.nan],
+    "Ga": [9251.74, 9224.82, 10264.2, 1097.92, 1097.92, 1124.8, np.nan, np.nan, np.nan],
+    "Ge": [9886.42, 9855.32, 10982.1, 1188.00, 1188.00, 1218.5, np.nan, np.nan, np.nan],
+    "As": [10543.72, 10507.99, 11726.2, 1282.00, 1282.00, 1317.0, np.nan, np.nan, np.nan],
+    "Se": [11222.4, 11181.4, 12495.9, 1379.10, 1379.10, 1419.23, np.nan, np.nan, np.nan],
+    "Br": [11924.2, 11877.6, 13291.4, 1480.43, 1480.43, 1525.90, np.nan, np.nan, np.nan],
+    "Kr": [12649, 12598, 14112, 1586.0, 1586.0, 1636.6, np.nan, np.nan, np.nan],
+    "Rb": [13395.3, 13335.8, 14961.3, 1694.13, 1692.56, 1752.17, np.nan, np.nan, np.nan],
+    "Sr": [14165, 14097.9, 15835.7, 1806.56, 1804.74, 1871.72, np.nan, np.nan, np.nan],
+    "Y": [14958.4, 14882.9, 16737.8, 1922.56, 1920.47, 1995.84, np.nan, np.nan, np.nan],
+    "Zr": [15775.1, 15690.9, 17667.8, 2042.36, 2039.9, 2124.4, 2219.4, 2302.7, np.nan],
+
+    "Nb": [16615.1, 16521.0, 18622.5, 2165.89, 2163.0, 2257.4, 2367.0, 2461.8, np.nan],
+    "Mo": [17479.34, 17374.3, 19608.3, 2293.16, 2289.85, 2394.81, 2518.3, 2623.5, np.nan],
+    "Tc": [18367.1, 18250.8, 20619.0, 2424.0, 2420.0, 2538.0, 2674.0, 2792.0, np.nan],
+    "Ru": [19279.2, 19150.4, 21656.8, 2558.55, 2554.31, 2683.23, 2836.0, 2964.5, np.nan],
+    "Rh": [20216.1, 20073.7, 22723.6, 2696.74, 2692.05, 2834.41, 3001.3, 3143.8, np.nan],
+    "Pd": [21177.1, 21020.1, 23818.7, 2838.61, 2833.29, 2990.22, 3171.79, 3328.7, np.nan],
+    "Ag": [22162.92, 21990.3, 24942.4, 2984.31, 2978.21, 3150.94, 3347.81, 3519.59, np.nan],
+    "Cd": [23173.6, 22984.1, 26095.5, 3133.73, 3126.91, 3316.57, 3528.12, 3716.86, np.nan],
+    "In": [24209.7, 24002.0, 27275.9, 3286.94, 3279.29, 3487.21, 3713.81, 3920.81, np.nan],
+    "Sn": [25271.3, 25044.0, 28486.0, 3443.93, 3435.42, 3662.80, 3904.86, 4131.12, np.nan],
+    "Sb": [26359.1, 26110.8, 29725.6, 3604.72, 3595.32, 3843.57, 4100.78, 4347.79, np.nan],
+    "Te": [27472.4, 27201.7, 30995.7, 3769.33, 3758.8, 4029.58, 4301.7, 4570.9, np.nan],
+    "I": [28612.0, 28317.2, 32294.7, 3937.65, 3926.04, 4209.58, 4507.5, 4800.9, np.nan],
+    "Xe": [29779.0, 29458.0, 33624.0, 4109.9, np.nan, np.nan, np.nan, np.nan, np.nan],
+    "Cs": [30972.8, 30625.1, 34986.9, 4286.5, 4272.2, 4619.8, 4935.9, 5280.4, np.nan],
+    "Ba": [32193.6, 31817.1, 36378.2, 4466.26, 4450.9, 4827.53, 5156.5, 5531.1, np.nan],
+    "La": [33441.8, 33034.1, 37801.0, 4650.97, 4634.23, 5042.1, 5383.5, 5788.5, 833.0],
+    "Ce": [34719.7, 34278.9, 39257.3, 4840.2, 4823.0, 5262.2, 5613.4, 6052.0, 883.0],
+    "Pr": [36026.3, 35550.2, 40748.3, 5037.7, 5013.5, 5488.9, 5850.0, 6322.1, 929.0],
+    "Nd": [37361.0, 36847.4, 42271.3, 5236.6, 5207.7, 5721.6, 6089.4, 6602.1, 978.0],
+    "Pm": [38724.7, 38171.2, 43826.0, 5432.5, 5407.8, 5961.0, 6339.0, 6892.0, np.nan],
+    "Sm": [40118.1, 39522.4, 45413.0, 5636.1, 5609.0, 6205.1, 6586.0, 7178.0, 1081.0],
+
+    "Eu": [41542.2, 40901.9, 47037.9, 5845.7, 5816.6, 6456.4, 6843.2, 7480.3, 1131.0],
+    "Gd": [42996.2, 42308.9, 48697.0, 6057.2, 6025.0, 6713.2, 7102.8, 7785.8, 1185.0],
+    "Tb": [44481.6, 43744.1, 50382.0, 6272.8, 6238.0, 6978.0, 7366.7, 8102.0, 1240.0],
+    "Dy": [45998.4, 45207.8, 52119.0, 6495.2, 6457.7, 7247.7, 7635.7, 8418.8, 1293.0],
+    "Ho": [47546.7, 46699.7, 53877.0, 6719.8, 6679.5, 7525.3, 7911.0, 8747.0, 1348.0],
+    "Er": [49127.7, 48221.1, 55681.0, 6948.7, 6905.0, 7810.9, 8189.0, 9089.0, 1406.0],
+    "Tm": [50741.6, 49772.6, 57517.0, 7179.9, 7133.1, 8101.0, 8468.0, 9426.0, 1462.0],
+    "Yb": [52388.9, 51354.0, 59370.0, 7415.6, 7367.3, 8401.8, 8758.8, 9780.1, 1521.4],
+    "Lu": [54069.8, 52965.0, 61283.0, 7655.5, 7604.9, 8709.0, 9048.9, 10143.4, 1581.3],
+    "Hf": [55790.2, 54611.4, 63234.0, 7899.0, 7844.6, 9022.7, 9347.3, 10515.8, 1644.6],
+    "Ta": [57532.0, 56277.0, 65223.0, 8146.1, 8087.9, 9343.1, 9651.8, 10895.2, 1710.0],
+    "W": [59318.24, 57981.7, 67244.3, 8397.6, 8335.3, 9672.35, 9961.5, 11285.9, 1775.4],
+    "Re": [61140.3, 59717.9, 69310.0, 8652.5, 8586.2, 10010.0, 10275.2, 11685.4, 1842.5],
+    "Os": [63000.5, 61486.7, 71413.0, 8911.7, 8841.0, 10355.3, 10598.5, 12095.3, 1910.2],
+    "Ir": [64995.6, 63286.7, 73560.8, 9175.1, 9099.5, 10708.3, 10920.3, 12512.6, 1979.9],
+    "Pt": [66832.0, 65112.0, 75748.0, 9442.3, 9361.8, 11070.7, 11250.5, 12942.0, 2050.5],
+    "Au": [68803.7, 66995.9, 77948.0, 9718.4, 9628.0, 11407.0, 11584.7, 13381.4, 2122.9],
+    "Hg": [70819.0, 68895.0, 80253.0, 9988.8, 9897.6, 11822.6, 11924.1, 13830.1, 2195.3],
+    "Tl": [72871.5, 70831.9, 82576.0, 10268.5, 10172.8, 12213.3, 12271.5, 14291.5, 2270.6],
+
+    "Pb": [74969.4, 72804.2, 84936.0, 10551.5, 10449.5, 12613.7, 12622.6, 14764.4, 2345.5],
+    "Bi": [77107.9, 74814.8, 87343.0, 10838.8, 10730.91, 13023.5, 12979.9, 15247.7, 2422.6],
+    "Po": [79290.0, 76862.0, 89800.0, 11130.8, 11015.8, 13447.0, 13340.4, 15744.0, np.nan],
+    "At": [81520.0, 78950.0, 92300.0, 11426.8, 11304.8, 13876.0, np.nan, 16251.0, np.nan],
+    "Rn": [83780.0, 81070.0, 94870.0, 11727.0, 11597.9, 14316.0, np.nan, 16770.0, np.nan],
+    "Fr": [86100.0, 83230.0, 97470.0, 12031.3, 11895.0, 14770.0, 14450.0, 17303.0, np.nan],
+    "Ra": [88470.0, 85430.0, 100130.0, 12339.7, 12196.2, 15325.8, 14841.4, 17849.0, np.nan],
+    "Ac": [90884.0, 87670.0, 102850.0, 12652.0, 12500.8, 15713.0, np.nan, 18408.0, np.nan],
+    "Th": [93350.0, 89953.0, 105609.0, 12968.7, 12809.6, 16202.2, 15623.7, 18982.5, 2996.1],
+    "Pa": [95868.0, 92287.0, 108427.0, 13290.7, 13122.2, 16702.0, 16024.0, 19568.0, 3082.3],
+    "U": [98439.0, 94665.0, 111300.0, 13614.7, 13438.8, 17220.0, 16428.3, 20167.1, 3170.8],
+    "Np": [np.nan, np.nan, np.nan, 13944.1, 13759.7, 17750.2, 16840.0, 20784.8, np.nan],
+    "Pu": [np.nan, np.nan, np.nan, 14278.6, 14084.2, 18293.7, 17255.3, 21417.3, np.nan],
+    "Am": [np.nan, np.nan, np.nan, 14617.2, 14411.9, 18852.0, 17676.5, 22065.2, np.nan]
+}
+
+
+class XRayLineIndex:
+    """
+    All tabulated (element, line, energy) entries sorted by energy.
+
+    Attributes:
+      energies (np.ndarray): float64 energies in eV, ascending.
+      elements (np.ndarray): element symbol of each entry.
+      lines    (np.ndarray): line name of each entry (e.g. 'Ka').
+    """
+    def __init__(self, x_ray_energies=X_RAY_ENERGIES, line_names=LINE_NAMES):
+        elements, lines, energies = [], [], []
+        for element, values in x_ray_energies.items():
+            for line, energy in zip(line_names, values):
+                if not np.isnan(energy):
+                    elements.append(element)
+                    lines.append(line)
+                    energies.append(energy)
+        order = np.argsort(energies, kind='stable')
+        self.energies = np.asarray(energies, dtype=np.float64)[order]
+        self.elements = np.asarray(elements)[order]
+        self.lines = np.asarray(lines)[order]
+        self.lookup = {f"{e}_{l}": float(E) for e, l, E in zip(self.elements, self.lines, self.energies)}
+        for array in (self.energies, self.elements, self.lines):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.energies)
+
+    def energy(self, x_ray_line):
+        """
+        Energy in eV of a line code such as 'Al_Ka'.
+        """
+        try:
+            return self.lookup[x_ray_line]
+        except KeyError:
+            raise KeyError(f"No energy tabulated for x-ray line '{x_ray_line}'") from None
+
+    def bounds(self, energies, tolerance):
+        """
+        Vectorized binary search: for each energy E, entries [start, stop) lie within E +/- tolerance.
+        Args:
+            energies: scalar or array of energies in eV.
+            tolerance: scalar or array (broadcast with energies) in eV.
+        Returns:
+            (start, stop) integer arrays shaped like energies.
+        """
+        energies = np.asarray(energies, dtype=np.float64)
+        start = np.searchsorted(self.energies, energies - tolerance, side='left')
+        stop = np.searchsorted(self.energies, energies + tolerance, side='right')
+        return start, stop
+
+    def query(self, energy, tolerance):
+        """
+        Lines within energy +/- tolerance (eV), as a list of (element, line, energy) sorted by energy.
+        """
+        start, stop = self.bounds(energy, tolerance)
+        return [(str(self.elements[i]), str(self.lines[i]), float(self.energies[i])) for i in range(start, stop)]
+
+    def query_many(self, energies, tolerance):
+        """
+        Lines near many energies at once.
+        Returns:
+            (peak, entry): flat arrays, entry indexes energies/elements/lines of the index and
+            peak the position in 'energies' it matches; grouped by peak, sorted by energy within.
+        """
+        start, stop = self.bounds(np.ravel(energies), tolerance)
+        counts = stop - start
+        peak = np.repeat(np.arange(len(counts)), counts)
+        # entry = start of its peak + position within the peak's run
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        entry = np.repeat(start, counts) + offsets
+        return peak, entry
+
+_INDEX = None
+
+def xray_line_index():
+    """
+    Process-wide XRayLineIndex of X_RAY_ENERGIES, built on first use.
+    """
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = XRayLineIndex()
+    return _INDEX
+
+def _fwhm_ev(energies, resolution):
+    # resolution: Mn Ka resolution in eV, or callable FWHM(E) with both in eV
+    if callable(resolution):
+        return np.asarray(resolution(energies), dtype=np.float64)
+    return fwhm_at_energy(energies / 1000, resolution) * 1000
+
+@lru_cache(maxsize=128)
+def _overlap_matrix(x_ray_lines, resolution, include_family):
+    index = xray_line_index()
+    owners, members = [], []
+    for i, x_ray_line in enumerate(x_ray_lines):
+        element, line = x_ray_line.split('_', 1)
+        family = [name for name in LINE_NAMES if name[0] == line[0]] if include_family else [line]
+        for name in family:
+            if f"{element}_{name}" in index.lookup:
+                owners.append(i)
+                members.append(f"{element}_{name}")
+    energies = np.array([index.lookup[m] for m in members], dtype=np.float64)
+    owners = np.array(owners, dtype=np.intp)
+    # Bhattacharyya coefficient of two Gaussian peaks: 1 for identical peaks, ~0 when resolved
+    var = (_fwhm_ev(energies, resolution) / (2 * np.sqrt(2 * np.log(2)))) ** 2
+    var_sum = var[:, None] + var[None, :]
+    delta = energies[:, None] - energies[None, :]
+    pair = np.sqrt(2 * np.sqrt(var[:, None] * var[None, :]) / var_sum) * np.exp(-delta ** 2 / (4 * var_sum))
+    pair[owners[:, None] == owners[None, :]] = 0 # lines of the same selected line do not conflict
+    # selected line pair <- its most overlapping member pair
+    n = len(x_ray_lines)
+    flat = owners[:, None] * n + owners[None, :]
+    overlap = np.zeros(n * n)
+    np.maximum.at(overlap, flat.ravel(), pair.ravel())
+    best = np.full(n * n, -1, dtype=np.intp)
+    hit = pair.ravel() == overlap[flat.ravel()]
+    best[flat.ravel()[hit]] = np.flatnonzero(hit)
+    overlap = overlap.reshape(n, n)
+    np.fill_diagonal(overlap, 1.0)
+    overlap.flags.writeable = False
+    return overlap, best.reshape(n, n), tuple(members)
+
+def overlap_matrix(x_ray_lines, resolution=130.0, include_family=True):
+    """
+    Pairwise peak overlap of the selected lines at the detector resolution, cached per
+    selection and resolution model.
+    Args:
+        x_ray_lines: e.g. ['Ti_Ka', 'Ba_La'] (PeriodicTableApp format).
+        resolution: FWHM at Mn Ka in eV, or a callable FWHM(E) with E and FWHM in eV.
+                    A callable must be hashable (a function, not a lambda rebuilt each call).
+        include_family: also compare the other lines of each family (Kb1, Lb1, ...), so
+                        e.g. Ti_Ka is flagged against Ba_La through Ti Kb1 / Ba Lb1 as well.
+    Returns:
+        read-only (n, n) array in [0, 1], 1 on the diagonal. The overlap of two Gaussian peaks
+        is their Bhattacharyya coefficient: 0.5 at one FWHM apart, 0.06 at two FWHM.
+    """
+    return _overlap_matrix(tuple(x_ray_lines), resolution, include_family)[0]
+
+def overlap_conflicts(x_ray_lines, resolution=130.0, threshold=0.1, include_family=True):
+    """
+    Line pairs of a selection whose peaks overlap by at least threshold (see overlap_matrix),
+    to check before integrating windows.
+    Returns:
+        list of (line_a, line_b, overlap, (member_a, member_b)) sorted by decreasing overlap,
+        member_a/b being the lines of the families that actually overlap.
+    """
+    x_ray_lines = tuple(x_ray_lines)
+    overlap, best, members = _overlap_matrix(x_ray_lines, resolution, include_family)
+    m = len(members)
+    rows, cols = np.nonzero(np.triu(overlap, k=1) >= threshold)
+    conflicts = [(x_ray_lines[i], x_ray_lines[j], float(overlap[i, j]),
+                  (members[best[i, j] // m], members[best[i, j] % m])) for i, j in zip(rows, cols)]
+    return sorted(conflicts, key=lambda c: -c[2])
+
+"""
+Example use:
+index = xray_line_index()
+index.query(1487, 20)               # [('Br', 'La', 1480.43), ('Br', 'La2', 1480.43), ('Al', 'Ka2', 1486.27), ('Al', 'Ka', 1486.7)]
+index.energy('Fe_Ka')               # 6403.84
+peak, entry = index.query_many(peak_energies, 30)   # all candidates of thousands of peaks
+index.elements[entry], index.lines[entry]
+overlap_conflicts(['Ti_Ka', 'Ba_La', 'S_Ka', 'Mo_La', 'Pb_Ma'], resolution=130)
+# [('S_Ka', 'Pb_Ma', ...), ('S_Ka', 'Mo_La', ...), ('Ti_Ka', 'Ba_La', ...), ...]
+"""
\ No newline at end of file
@@ -1,26 +1,433 @@
-import hyperspy.api as hs
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .._lazy import LazyModule
+from .EDS_quantification import quantify_maps, quantify_maps_absorption
+from ..data.xray_lines import fwhm_at_energy, xray_line_index, overlap_conflicts
+
+# Heavy dependencies, imported on first use
+hs = LazyModule('hyperspy.api')
+plt = LazyModule('matplotlib.pyplot')
+mcolors = LazyModule('matplotlib.colors')
+mimage = LazyModule('matplotlib.image')
+
+# Colour cycle of the maps, shared by the plots, composites and exports
+EXTENDED_COLOR_NAMES = [
+    'blue', 'green', 'red', 'cyan', 'magenta', 'yellow',  'white',
+    'navy', 'teal', 'maroon', 'olive', 'purple', 'gold', 'brown', 'pink'
+    ]
+
+class _ColormapCache(dict):
+    # color name -> LinearSegmentedColormap, built on first access and kept for the process
+    def __init__(self, kind):
+        super().__init__()
+        self.kind = kind
+
+    def __missing__(self, color_name):
+        if self.kind == 'overlay':
+            colors = [(0, 0, 0, 0), mcolors.to_rgba(color_name)]  # Transparent to color
+        else:
+            colors = ['black', color_name]
+        cmap = self[color_name] = mcolors.LinearSegmentedColormap.from_list(color_name, colors)
+        return cmap
+
+COLORMAPS4OVERLAY = _ColormapCache('overlay')
+COLORMAPS4INDIVIDUAL = _ColormapCache('individual')
+_LUTS = {} # (kind, color name) -> (256, 4) uint8
+
+def colormap_lut(color_name, kind='individual'):
+    """
+    256-entry uint8 RGBA lookup table of the 'individual' (black to colour) or
+    'overlay' (transparent to colour) colormap, computed once per process.
+    """
+    key = (kind, color_name)
+    lut = _LUTS.get(key)
+    if lut is None:
+        cmaps = COLORMAPS4OVERLAY if kind == 'overlay' else COLORMAPS4INDIVIDUAL
+        lut = cmaps[color_name](np.arange(256), bytes=True)
+        lut.flags.writeable = False
+        _LUTS[key] = lut
+    return lut
+
+def colorize(eds_map, color_name, kind='individual', vmin=None, vmax=None, rgba=True):
+    """
+    Colour a map through its lookup table: the map is scaled once to 0..255 and the
+    result is a single integer index into the table, instead of matplotlib's float normalize path.
+    Parameters:
+    - eds_map: 2D array or HyperSpy signal
+    - color_name: colour of the colormap (e.g. one of EXTENDED_COLOR_NAMES)
+    - kind: 'individual' or 'overlay', as in EDS_Bruker.colormaps4individual / colormaps4overlay
+    - vmin, vmax: colour limits, map min / max by default (like imshow)
+    - rgba: return (rows, columns, 4), otherwise (rows, columns, 3)
+    Returns:
+    - uint8 image
+    """
+    data = _map_data(eds_map)
+    vmin = np.nanmin(data) if vmin is None else vmin
+    vmax = np.nanmax(data) if vmax is None else vmax
+    scale = np.float32(256 / (vmax - vmin) if vmax > vmin else 0)
+    # same binning as a 256-colour matplotlib colormap: floor(t * 256), clipped to 0..255
+    t = np.subtract(data, np.float32(vmin), dtype=np.float32)
+    t *= scale
+    np.clip(t, 0, 255, out=t)
+    t[np.isnan(t)] = 0
+    index = t.astype(np.uint8)
+    lut = colormap_lut(color_name, kind)
+    if rgba:
+        # one 32-bit word per entry, so the lookup is a single 1D take
+        return lut.view(np.uint32)[:, 0].take(index).view(np.uint8).reshape(index.shape + (4,))
+    return lut[:, :3].take(index, axis=0)
+
+def _line_energy(x_ray_line):
+    # keV, from the x_ray_energies table, or the exspy element database for lines it does not list
+    energy = xray_line_index().lookup.get(x_ray_line)
+    if energy is not None:
+        return energy / 1000
+    import exspy
+    element, line = x_ray_line.split('_')
+    return exspy.material.elements[element].Atomic_properties.Xray_lines[line].energy_keV
+
+def line_windows(x_ray_lines, energy_axis, width=2.0, energy_resolution_MnKa=130.0, energies=None):
+    """
+    Channel windows [c0, c1) of the x-ray lines on an energy axis.
+    Parameters:
+    - x_ray_lines: e.g. ['Al_Ka', 'O_Ka']
+    - energy_axis: (offset, scale, size) in keV
+    - width: window width in multiples of the detector FWHM at each line
+    - energy_resolution_MnKa: detector resolution at Mn Ka in eV
+    - energies: optional dict line -> energy in keV (default: x_ray_energies table, then exspy),
+                or line -> (start, end) in keV to give the windows directly
+    Returns:
+    - (n_lines, 2) int array of channels, clipped to the axis
+    """
+    offset, scale, size = energy_axis
+    energies = {} if energies is None else energies
+    bounds = np.empty((len(x_ray_lines), 2), dtype=np.float64)
+    for i, line in enumerate(x_ray_lines):
+        value = energies[line] if line in energies else _line_energy(line)
+        if np.ndim(value) == 1:
+            bounds[i] = value
+        else:
+            half = width * fwhm_at_energy(value, energy_resolution_MnKa) / 2
+            bounds[i] = value - half, value + half
+    channels = np.rint((bounds - offset) / scale).astype(np.int64)
+    channels[:, 1] += 1 # end channel included
+    return np.clip(channels, 0, size)
+
+def line_maps(data, windows, block_rows=None):
+    """
+    Intensity maps of every channel window in one pass over a (rows, columns, channels) cube.
+    The cube is cumulatively summed along the energy axis, so each window is one subtraction
+    per pixel whatever its width, and all windows share the same pass.
+    Parameters:
+    - data: numpy, memmap or dask array (rows, columns, channels)
+    - windows: (n_lines, 2) channel windows [c0, c1), e.g. from line_windows
+    - block_rows: rows processed at a time (default: the dask chunk rows, or about 64 MB of prefix sum
+                  for numpy/memmap); bounds the working memory to one block plus its prefix sum
+    Returns:
+    - (n_lines, rows, columns) array, int64 for integer counts, float64 otherwise
+    """
+    windows = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+    n_rows, n_cols, n_channels = data.shape
+    acc_dtype = np.int64 if np.issubdtype(data.dtype, np.integer) else np.float64
+    # only the channels up to the last window end are needed
+    stop = int(windows[:, 1].max()) if len(windows) else 0
+    if block_rows is None:
+        chunks = getattr(data, 'chunks', None) # dask: one row chunk per block
+        row_bytes = n_cols * (stop + 1) * np.dtype(acc_dtype).itemsize # prefix sum of one row
+        block_rows = chunks[0][0] if chunks else (64 * 2**20) // max(row_bytes, 1)
+    block_rows = max(int(block_rows), 1)
+    out = np.zeros((len(windows), n_rows, n_cols), dtype=acc_dtype)
+    prefix = None
+    for r0 in range(0, n_rows, block_rows):
+        r1 = min(r0 + block_rows, n_rows)
+        block = np.asarray(data[r0:r1, :, :stop]) # computes the rows of a dask array
+        if prefix is None or prefix.shape[0] != r1 - r0:
+            prefix = np.zeros((r1 - r0, n_cols, stop + 1), dtype=acc_dtype)
+        np.cumsum(block, axis=2, dtype=acc_dtype, out=prefix[:, :, 1:])
+        out[:, r0:r1] = np.moveaxis(prefix[:, :, windows[:, 1]] - prefix[:, :, windows[:, 0]], 2, 0)
+    return out
+
+def _map_data(eds_map):
+    # HyperSpy signal or array -> float32 array
+    return np.asarray(getattr(eds_map, 'data', eds_map), dtype=np.float32)
+
+def composite_maps(eds_maps, colors, mode='alpha', alpha=0.8, normalize='per_map', vmax_scaler=1.5,
+                   background='white', rgba=False, block_rows=512):
+    """
+    Blend a stack of EDS maps into one uint8 colour image in a single vectorized pass,
+    instead of stacking one imshow per map.
+    Parameters:
+    - eds_maps: list of 2D arrays / HyperSpy signals, or a (n_maps, rows, columns) array
+    - colors: one matplotlib colour per map (e.g. EDS_Bruker.extended_color_names)
+    - mode: 'alpha' reproduces the imshow overlay (each map drawn over the previous ones with a
+            transparent-to-colour colormap), 'additive' sums the coloured maps and clips
+    - alpha: opacity of each map in 'alpha' mode, and weight of each map in 'additive' mode
+    - normalize: 'per_map' scales each map to [0, max/vmax_scaler] like the overlay plot,
+                 'global' uses one range for all maps, None expects maps already in [0, 1]
+    - vmax_scaler: a scaler of vmax, as in plot_images_non_hs
+    - background: colour under the maps, white like the figure the overlay plot blends over
+    - rgba: return (rows, columns, 4) with an opaque alpha channel instead of (rows, columns, 3)
+    - block_rows: rows composited at a time, bounds the float32 working memory
+    Returns:
+    - uint8 image
+    """
+    maps = np.stack([_map_data(m) for m in eds_maps]) if not isinstance(eds_maps, np.ndarray) else eds_maps.astype(np.float32, copy=False)
+    n_maps, n_rows, n_cols = maps.shape
+    if len(colors) < n_maps:
+        raise ValueError(f"{n_maps} maps but only {len(colors)} colors")
+    rgb = np.array([mcolors.to_rgb(c) for c in colors[:n_maps]], dtype=np.float32) # (n_maps, 3)
+    bg = np.array(mcolors.to_rgb(background), dtype=np.float32)
+
+    if normalize == 'per_map':
+        vmax = maps.reshape(n_maps, -1).max(axis=1) / vmax_scaler
+    elif normalize == 'global':
+        vmax = np.full(n_maps, maps.max() / vmax_scaler, dtype=np.float32)
+    elif normalize is None:
+        vmax = np.ones(n_maps, dtype=np.float32)
+    else:
+        raise ValueError("normalize must be 'per_map', 'global' or None")
+    scale = np.where(vmax > 0, 1 / np.where(vmax > 0, vmax, 1), 0).astype(np.float32)[:, None, None]
+
+    out = np.empty((n_rows, n_cols, 4 if rgba else 3), dtype=np.uint8)
+    if rgba:
+        out[..., 3] = 255
+    for r0 in range(0, n_rows, block_rows):
+        r1 = min(r0 + block_rows, n_rows)
+        t = np.clip(maps[:, r0:r1] * scale, 0, 1) # (n_maps, rows, columns), vmin = 0
+        if mode == 'additive':
+            image = bg + alpha * np.einsum('nhw,nc->hwc', t, rgb)
+        elif mode == 'alpha':
+            # map i has colour t*rgb and opacity a = alpha*t; drawn in order, what reaches the eye from
+            # map i is a_i * t_i * rgb_i attenuated by (1 - a_j) of every map j drawn after it
+            a = alpha * t
+            transmit = np.cumprod((1 - a)[::-1], axis=0)[::-1] # prod over j >= i
+            after = np.concatenate([transmit[1:], np.ones_like(transmit[:1])]) # prod over j > i
+            image = np.einsum('nhw,nc->hwc', a * t * after, rgb) + transmit[0][..., None] * bg
+        else:
+            raise ValueError("mode must be 'alpha' or 'additive'")
+        out[r0:r1, :, :3] = np.clip(image * 255 + 0.5, 0, 255).astype(np.uint8)
+    return out
+
+def _downsample2(level):
+    # 2x2 mean, odd edges padded by repeating the last row/column; uint8 stays uint8
+    rows, cols = level.shape[:2]
+    if rows % 2 or cols % 2:
+        pad = [(0, rows % 2), (0, cols % 2)] + [(0, 0)] * (level.ndim - 2)
+        level = np.pad(level, pad, mode='edge')
+    rows, cols = level.shape[:2]
+    blocks = level.reshape((rows // 2, 2, cols // 2, 2) + level.shape[2:])
+    mean = blocks.mean(axis=(1, 3), dtype=np.float32)
+    if level.dtype == np.uint8:
+        return (mean + 0.5).astype(np.uint8)
+    return mean
+
+class MapPyramid:
+    """
+    Multi-resolution pyramid of one element map (rows, columns) or composite (rows, columns, 3|4):
+    level 0 is the map itself, each next level is 2x downsampled, down to a single tile.
+    Levels are cut in tile_size x tile_size tiles (views, nothing is copied), so a view only
+    touches the tiles it shows, at the coarsest level that still has one map pixel per screen pixel.
+    """
+    def __init__(self, eds_map, tile_size=256):
+        # composites (rows, columns, 3|4) are kept as they are, element maps of any dtype become float32
+        self.composite = isinstance(eds_map, np.ndarray) and eds_map.ndim == 3 and eds_map.shape[-1] in (3, 4)
+        level = eds_map if self.composite else _map_data(eds_map)
+        self.tile_size = tile_size
+        self.shape = level.shape[:2]
+        self.levels = [level]
+        while max(level.shape[:2]) > tile_size:
+            level = _downsample2(level)
+            self.levels.append(level)
+
+    @property
+    def n_levels(self):
+        return len(self.levels)
+
+    def level_for(self, view_rows, view_cols, screen_rows, screen_cols):
+        """
+        Coarsest level with at least one pixel per screen pixel for a view of
+        view_rows x view_cols full-resolution pixels drawn on screen_rows x screen_cols pixels.
+        """
+        factor = min(view_rows / max(screen_rows, 1), view_cols / max(screen_cols, 1))
+        if factor < 2:
+            return 0
+        return int(min(np.floor(np.log2(factor)), self.n_levels - 1))
+
+    def tile_range(self, level, rows, cols):
+        """
+        Tiles (ty0, ty1, tx0, tx1) of a level covering full-resolution rows=(r0, r1), cols=(c0, c1).
+        """
+        n_rows, n_cols = self.levels[level].shape[:2]
+        step = self.tile_size * 2 ** level # full-resolution pixels per tile
+        ty0, tx0 = max(int(rows[0] // step), 0), max(int(cols[0] // step), 0)
+        ty1 = min(int(np.ceil(rows[1] / step)), -(-n_rows // self.tile_size))
+        tx1 = min(int(np.ceil(cols[1] / step)), -(-n_cols // self.tile_size))
+        return ty0, max(ty1, ty0), tx0, max(tx1, tx0)
+
+    def tile(self, level, ty, tx):
+        t = self.tile_size
+        return self.levels[level][ty * t:(ty + 1) * t, tx * t:(tx + 1) * t]
+
+    def region(self, level, rows, cols):
+        """
+        Level pixels covering full-resolution rows=(r0, r1), cols=(c0, c1), snapped to whole tiles.
+        Returns:
+        - (array, extent) where extent = (c0, c1, r1, r0) in full-resolution pixels, ready for imshow
+        """
+        ty0, ty1, tx0, tx1 = self.tile_range(level, rows, cols)
+        t = self.tile_size
+        data = self.levels[level][ty0 * t:ty1 * t, tx0 * t:tx1 * t]
+        scale = 2 ** level
+        r0, c0 = ty0 * t * scale, tx0 * t * scale
+        r1 = min(r0 + data.shape[0] * scale, self.shape[0])
+        c1 = min(c0 + data.shape[1] * scale, self.shape[1])
+        return data, (c0 - 0.5, c1 - 0.5, r1 - 0.5, r0 - 0.5)
+
+    def stats_level(self, max_pixels=2**18):
+        # finest level with at most max_pixels pixels
+        for i, level in enumerate(self.levels):
+            if level.shape[0] * level.shape[1] <= max_pixels:
+                return i
+        return self.n_levels - 1
+
+    def contrast(self, low=0, high=100, max_pixels=2**18):
+        """
+        (vmin, vmax) percentiles of the map, computed on a coarse level (at most max_pixels pixels)
+        instead of the full-resolution map. Averaging lowers isolated extremes, so low/high = 0/100
+        is the min/max of the 2^level binned map.
+        """
+        level = self.levels[self.stats_level(max_pixels)]
+        values = level[np.isfinite(level)] if level.dtype != np.uint8 else level.ravel()
+        if values.size == 0:
+            return 0.0, 0.0
+        return tuple(float(v) for v in np.percentile(values, (low, high)))
+
+class PyramidView:
+    """
+    Draws pyramids of element maps (overlaid as in composite_maps) or of a composite on a
+    matplotlib Axes. Whenever the view changes, only the visible tiles of the level matching the
+    screen resolution are composited (and cached), then shown with one imshow.
+    """
+    def __init__(self, ax, pyramids, colors=None, mode='alpha', alpha=0.8, vmax_scaler=1.5,
+                 background='white', cache_tiles=512):
+        """
+        Parameters:
+        - ax: matplotlib Axes
+        - pyramids: list of MapPyramid of element maps (same shape), or one MapPyramid of a composite
+        - colors: one colour per map (element maps only)
+        - mode, alpha, background: as in composite_maps
+        - vmax_scaler: vmax = max / vmax_scaler per map, the max coming from a coarse level
+        - cache_tiles: composited tiles kept (least recently used are dropped)
+        """
+        self.ax = ax
+        self.pyramids = list(pyramids) if isinstance(pyramids, (list, tuple)) else [pyramids]
+        self.colors = colors
+        self.mode = mode
+        self.alpha = alpha
+        self.background = background
+        self.cache_tiles = cache_tiles
+        self.composite = self.pyramids[0].composite
+        # contrast from the coarse levels, the full-resolution maps are never scanned
+        self.vmax = np.array([p.contrast()[1] / vmax_scaler for p in self.pyramids], dtype=np.float32)
+        self.tiles = {} # (level, ty, tx) -> uint8 tile, in insertion/use order
+        n_rows, n_cols = self.pyramids[0].shape
+        self.image = ax.imshow(np.zeros((1, 1, 3), dtype=np.uint8), interpolation='nearest',
+                               extent=(-0.5, n_cols - 0.5, n_rows - 0.5, -0.5))
+        ax.set_xlim(-0.5, n_cols - 0.5)
+        ax.set_ylim(n_rows - 0.5, -0.5)
+        self.render()
+        ax.callbacks.connect('xlim_changed', self._on_change)
+        ax.callbacks.connect('ylim_changed', self._on_change)
+
+    def _on_change(self, ax):
+        self.render()
+
+    def _tile(self, level, ty, tx):
+        key = (level, ty, tx)
+        tile = self.tiles.pop(key, None)
+        if tile is None:
+            if self.composite:
+                tile = self.pyramids[0].tile(level, ty, tx)
+            else:
+                stack = np.stack([p.tile(level, ty, tx) for p in self.pyramids])
+                scale = np.where(self.vmax > 0, 1 / np.where(self.vmax > 0, self.vmax, 1), 0)
+                tile = composite_maps(stack * scale[:, None, None].astype(np.float32), self.colors,
+                                      mode=self.mode, alpha=self.alpha, normalize=None,
+                                      background=self.background)
+            if len(self.tiles) >= self.cache_tiles:
+                self.tiles.pop(next(iter(self.tiles)))
+        self.tiles[key] = tile
+        return tile
+
+    def render(self):
+        pyramid = self.pyramids[0]
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        bbox = self.ax.get_window_extent()
+        level = pyramid.level_for(y1 - y0, x1 - x0, bbox.height, bbox.width)
+        rows, cols = (y0 + 0.5, y1 + 0.5), (x0 + 0.5, x1 + 0.5)
+        ty0, ty1, tx0, tx1 = pyramid.tile_range(level, rows, cols)
+        if ty1 == ty0 or tx1 == tx0:
+            return
+        image = np.concatenate([np.concatenate([self._tile(level, ty, tx) for tx in range(tx0, tx1)], axis=1)
+                                for ty in range(ty0, ty1)], axis=0)
+        extent = pyramid.region(level, rows, cols)[1]
+        self.image.set_data(image)
+        self.image.set_extent(extent)
+        self.ax.set_xlim(x0, x1, emit=False) # set_extent autoscales, keep the view
+        self.ax.set_ylim(y1, y0, emit=False)
+        self.ax.figure.canvas.draw_idle()
+
+def _export_dataset(task):
+    # Runs in a worker process. Only the object-oriented Figure/Agg API and imsave are used,
+    # so no pyplot state (and no GUI backend) is involved
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    name, maps, labels, out_dir, kinds, fmt, color_names, alpha, vmax_scaler, figure, dpi = task
+    paths = []
+    if 'i' in kinds:
+        for i, eds_map in enumerate(maps):
+            color_name = color_names[i % len(color_names)]
+            path = os.path.join(out_dir, f"{name}_{i:02d}_{labels[i]}.{fmt}")
+            if figure:
+                fig = Figure(figsize=(6, 6), dpi=dpi)
+                FigureCanvasAgg(fig)
+                ax = fig.add_subplot()
+                image = ax.imshow(eds_map, cmap=COLORMAPS4INDIVIDUAL[color_name])
+                fig.colorbar(image, ax=ax, label='Intensity')
+                ax.set_title(f"{name} {labels[i]}", fontsize=14)
+                ax.axis('off')
+                fig.savefig(path, format=fmt)
+            else:
+                mimage.imsave(path, colorize(eds_map, color_name), format=fmt)
+            paths.append(path)
+    if 'o' in kinds:
+        overlay = composite_maps(maps, [color_names[i % len(color_names)] for i in range(len(maps))],
+                                 alpha=alpha, vmax_scaler=vmax_scaler)
+        path = os.path.join(out_dir, f"{name}_overlay.{fmt}")
+        if figure:
+            fig = Figure(figsize=(8, 8), dpi=dpi)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.imshow(overlay, interpolation='None')
+            ax.set_title(f"{name} overlay", fontsize=16)
+            ax.axis('off')
+            fig.savefig(path, format=fmt)
+        else:
+            mimage.imsave(path, overlay, format=fmt)
+        paths.append(path)
+    return paths
 
 class EDS_Bruker:
     def __init__(self,elements, x_ray_lines):
         self.colors = ['r','g','b','m','c','y','w','r','g','b','m','c','y','w']
         self.elements = elements
         self.x_ray_lines = x_ray_lines
-        self.extended_color_names = [
-            'blue', 'green', 'red', 'cyan', 'magenta', 'yellow',  'white',
-            'navy', 'teal', 'maroon', 'olive', 'purple', 'gold', 'brown', 'pink'
-            ]
-        self.colormaps4overlay = {}
-        self.colormaps4individual = {}
-        for color_name in self.extended_color_names:
-            self.colormaps4overlay[color_name] = mcolors.LinearSegmentedColormap.from_list(
-                color_name, [(0, 0, 0, 0), mcolors.to_rgba(color_name)]  # Transparent to color
-            )
-            self.colormaps4individual[color_name] = mcolors.LinearSegmentedColormap.from_list(
-                color_name, ['black', color_name]
-            )
+        self.extended_color_names = EXTENDED_COLOR_NAMES
+        # shared per process, each colormap is built the first time it is used
+        self.colormaps4overlay = COLORMAPS4OVERLAY
+        self.colormaps4individual = COLORMAPS4INDIVIDUAL
     def plot_images_non_hs(self,eds_maps, plot_type,alpha=0.8,vmax_scaler=1.5):
         """
         Plots EDS maps either individually or as an overlay based on plot_type.
@@ -101,9 +508,191 @@ class EDS_Bruker:
             plt.axis('off')
             plt.show()
 
+    def get_line_maps(self, spectrum_image, width=2.0, energy_resolution_MnKa=130.0, energies=None,
+                      block_rows=None, overlap_threshold=0.1):
+        """
+        eds_maps of every line in x_ray_lines, computed in a single pass over the spectrum image
+        (see line_maps) instead of one integration per line.
+        Parameters:
+        - spectrum_image: HyperSpy EDS signal (lazy or not) or (rows, columns, channels) array;
+                          for an array the energy axis is given as energies['axis'] = (offset, scale)
+                          in keV (default: (0, 1), i.e. windows in channels)
+        - width: window width in multiples of the detector FWHM
+        - energy_resolution_MnKa: detector resolution at Mn Ka in eV (default: the signal metadata, else 130)
+        - energies: optional dict line -> energy or (start, end) in keV, see line_windows
+        - block_rows: rows per block, for lazy or very large data
+        - overlap_threshold: lines overlapping at least this much at the detector resolution are
+                             reported before integrating (see line_overlaps), None to skip the check
+        Returns:
+        - list of maps in x_ray_lines order, Signal2D with the x/y calibration for a HyperSpy input,
+          arrays otherwise
+        """
+        energies = {} if energies is None else dict(energies)
+        is_signal = hasattr(spectrum_image, 'axes_manager')
+        data = spectrum_image.data if is_signal else spectrum_image
+        if is_signal:
+            axis = spectrum_image.axes_manager.signal_axes[0]
+            offset, scale = axis.offset, axis.scale
+            for microscope in ('SEM', 'TEM'):
+                resolution = spectrum_image.metadata.get_item(
+                    f'Acquisition_instrument.{microscope}.Detector.EDS.energy_resolution_MnKa')
+                if resolution is not None:
+                    energy_resolution_MnKa = resolution
+                    break
+        else:
+            offset, scale = energies.pop('axis', (0.0, 1.0))
+        if overlap_threshold is not None:
+            for line_a, line_b, overlap, (member_a, member_b) in self.line_overlaps(
+                    energy_resolution_MnKa, overlap_threshold):
+                print(f"Warning: {line_a} and {line_b} overlap ({member_a} / {member_b}, {overlap:.2f}), "
+                      f"their maps share counts")
+        windows = line_windows(self.x_ray_lines, (offset, scale, data.shape[-1]), width=width,
+                               energy_resolution_MnKa=energy_resolution_MnKa, energies=energies)
+        maps = line_maps(data, windows, block_rows=block_rows)
+        if not is_signal:
+            return list(maps)
+        eds_maps = []
+        for line, line_map in zip(self.x_ray_lines, maps):
+            image = hs.signals.Signal2D(line_map)
+            for i in range(2):
+                target, source = image.axes_manager[i], spectrum_image.axes_manager.navigation_axes[i]
+                target.name, target.units = source.name, source.units
+                target.scale, target.offset = source.scale, source.offset
+            image.metadata.General.title = f"{spectrum_image.metadata.General.title} {line}"
+            eds_maps.append(image)
+        return eds_maps
+
+    def line_overlaps(self, energy_resolution_MnKa=130.0, threshold=0.1):
+        """
+        Pairs of x_ray_lines whose peaks overlap at the detector resolution (see overlap_conflicts),
+        e.g. Ti_Ka / Ba_La or S_Ka / Mo_La / Pb_Ma. Lines missing from the x_ray_energies table are skipped.
+        """
+        index = xray_line_index()
+        known = [line for line in self.x_ray_lines if line in index.lookup]
+        return overlap_conflicts(known, energy_resolution_MnKa, threshold)
+
+    def quantify(self, eds_maps, composition_units='atomic', kfactors=None, mass_thickness=None, **kwargs):
+        """
+        Cliff-Lorimer composition maps of x_ray_lines from their intensity maps, all pixels at once
+        (see quantify_maps; mask, min_counts, block_pixels, workers... are passed through).
+        With mass_thickness (g/cm^2, scalar or map) the absorption-corrected solver is used
+        (see quantify_maps_absorption; take_off_angle, mac, tol... are passed through).
+        Returns:
+        - list of fraction maps in x_ray_lines order; with return_uncertainty=True,
+          (fraction maps, uncertainty maps)
+        """
+        if mass_thickness is not None:
+            results = quantify_maps_absorption(eds_maps, self.x_ray_lines, mass_thickness, kfactors=kfactors,
+                                               composition_units=composition_units, **kwargs)
+        else:
+            results = quantify_maps(eds_maps, self.x_ray_lines, kfactors=kfactors,
+                                    composition_units=composition_units, **kwargs)
+        if isinstance(results, tuple):
+            return tuple(list(r) if r.ndim == 3 else r for r in results)
+        return list(results)
+
+    def colorize(self, eds_maps, kind='individual', vmin=None, vmax=None, rgba=True):
+        """
+        uint8 colour images of the maps through the shared lookup tables (see colorize),
+        colours cycling through extended_color_names like the plots.
+        """
+        return [colorize(eds_maps[i], self.extended_color_names[i % len(self.extended_color_names)],
+                         kind=kind, vmin=vmin, vmax=vmax, rgba=rgba) for i in range(len(eds_maps))]
+
+    def composite(self, eds_maps, mode='alpha', alpha=0.8, normalize='per_map', vmax_scaler=1.5,
+                  background='white', rgba=False):
+        """
+        Overlay of EDS maps as one uint8 RGB(A) array, computed without matplotlib figures
+        (see composite_maps). Colours cycle through extended_color_names like the plots do.
+        """
+        colors = [self.extended_color_names[i % len(self.extended_color_names)] for i in range(len(eds_maps))]
+        return composite_maps(eds_maps, colors, mode=mode, alpha=alpha, normalize=normalize,
+                              vmax_scaler=vmax_scaler, background=background, rgba=rgba)
+
+    def plot_composite(self, eds_maps, mode='alpha', alpha=0.8, vmax_scaler=1.5):
+        """
+        Same picture as plot_type 'o', drawn with a single imshow of the composite.
+        """
+        image = self.composite(eds_maps, mode=mode, alpha=alpha, vmax_scaler=vmax_scaler)
+        plt.figure(figsize=(8, 8))
+        plt.imshow(image, interpolation='None')
+        plt.title("Overlay of EDS Maps", fontsize=16)
+        plt.axis('off')
+        plt.show()
+        return image
+
+    def pyramids(self, eds_maps, tile_size=256):
+        """
+        One MapPyramid per map, for large maps drawn with plot_pyramid.
+        """
+        return [MapPyramid(eds_map, tile_size=tile_size) for eds_map in eds_maps]
+
+    def plot_pyramid(self, eds_maps, mode='alpha', alpha=0.8, vmax_scaler=1.5, tile_size=256):
+        """
+        Overlay like plot_type 'o' for large maps: zooming and panning only composite the visible tiles
+        of the pyramid level matching the screen resolution.
+        Parameters:
+        - eds_maps: list of maps, or the list of MapPyramid returned by pyramids (reused between plots)
+        Returns:
+        - the PyramidView (keep a reference, it updates the image while the figure is open)
+        """
+        pyramids = [m if isinstance(m, MapPyramid) else MapPyramid(m, tile_size=tile_size) for m in eds_maps]
+        colors = [self.extended_color_names[i % len(self.extended_color_names)] for i in range(len(pyramids))]
+        fig = plt.figure(figsize=(8, 8))
+        ax = fig.add_subplot()
+        view = PyramidView(ax, pyramids, colors, mode=mode, alpha=alpha, vmax_scaler=vmax_scaler)
+        ax.set_title("Overlay of EDS Maps", fontsize=16)
+        ax.axis('off')
+        plt.show()
+        return view
+
+    def export_maps(self, datasets, out_dir, kinds=('i', 'o'), fmt='png', workers=None,
+                    alpha=0.8, vmax_scaler=1.5, figure=False, dpi=100):
+        """
+        Write individual maps and/or overlays to image files without any interactive figure,
+        one dataset per task in a process pool.
+        Parameters:
+        - datasets: dict {name: eds_maps} or list of eds_maps (named dataset_000, dataset_001, ...)
+        - out_dir: output directory (created if needed)
+        - kinds: 'i' for individual maps, 'o' for the overlay, or both
+        - fmt: 'png' or 'tiff' (anything matplotlib can save)
+        - workers: number of worker processes (None = number of CPUs, 1 = no pool)
+        - alpha, vmax_scaler: overlay settings, as in plot_images_non_hs
+        - figure: False writes the bare images (one pixel per map pixel),
+                  True writes figures with title and colorbar like the plots
+        - dpi: resolution of the figures when figure=True
+        Returns:
+        - list of written paths, in dataset order
+        """
+        if not isinstance(datasets, dict):
+            datasets = {f"dataset_{i:03d}": eds_maps for i, eds_maps in enumerate(datasets)}
+        os.makedirs(out_dir, exist_ok=True)
+        tasks = []
+        for name, eds_maps in datasets.items():
+            maps = [_map_data(m) for m in eds_maps] # plain arrays, HyperSpy signals do not pickle
+            if len(self.x_ray_lines) >= len(maps):
+                labels = list(self.x_ray_lines[:len(maps)])
+            else:
+                labels = [f"map{i}" for i in range(len(maps))]
+            tasks.append((name, maps, labels, out_dir, kinds, fmt, self.extended_color_names,
+                          alpha, vmax_scaler, figure, dpi))
+        if workers == 1:
+            results = [_export_dataset(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_export_dataset, tasks))
+        return [path for paths in results for path in paths]
+
 
 """
 Example use:
 plot_images_non_hs(eds_maps, 'o') for overlay 
 plot_images_non_hs(eds_maps, 'i') for each individual map
+export_maps({'sample1': eds_maps, 'sample2': other_maps}, 'maps_out', fmt='tiff') to write every map and overlay to files
+eds_maps = EDS_Bruker(elements, ['Al_Ka', 'O_Ka']).get_line_maps(spectrum_image) for the maps of all lines in one pass
+images = colorize(eds_maps) for each map as a uint8 RGBA array through the shared lookup tables
+fractions = quantify(eds_maps, min_counts=10) for atomic fraction maps with the HD2700 k-factors
+fractions, sigmas = quantify(eds_maps, background=bg_maps, return_uncertainty=True) to get the counting uncertainty too
+view = plot_pyramid(eds_maps) for an overlay of large maps that stays fast while zooming and panning
+image = composite(eds_maps) for the overlay as a uint8 RGB array (no figure), plot_composite(eds_maps) to show it
 """
\ No newline at end of file
@@ -0,0 +1,128 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from .._lazy import LazyModule
+from .EDAX_EDS_loader import HDF5SignalProcessor
+
+hs = LazyModule('hyperspy.api')
+
+class EDAXCache:
+    """
+    On-disk cache of calibrated EDAX signals, so reopening the same .h5 file skips the HDF5 walk,
+    the read and the dtype conversion done by HDF5SignalProcessor.
+
+    Each entry is a directory with one chunked, gzip-compressed .hspy file per signal.
+    The key combines the absolute source path, its size and mtime, a content hash and the
+    processor options that change the data (dtype, ...). When the cache grows past max_bytes,
+    the least recently used entries are removed.
+    """
+    def __init__(self, cache_dir=None, max_bytes=20 * 2**30, hash_bytes=4 * 2**20):
+        """
+        Parameters:
+        - cache_dir: where entries are stored (default: $CV4EM_CACHE or ~/.cache/CV4EM/edax)
+        - max_bytes: size cap of the whole cache, enforced with LRU eviction after each store
+        - hash_bytes: bytes hashed at the start, middle and end of the source file.
+                      None hashes the whole file (exact, but reads it completely on every lookup).
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get('CV4EM_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'CV4EM', 'edax'))
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hash_bytes = hash_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def content_hash(self, file_name):
+        digest = hashlib.blake2b(digest_size=16)
+        size = os.path.getsize(file_name)
+        with open(file_name, 'rb') as f:
+            if self.hash_bytes is None or size <= 3 * self.hash_bytes:
+                for block in iter(lambda: f.read(2**20), b''):
+                    digest.update(block)
+            else:
+                for start in (0, (size - self.hash_bytes) // 2, size - self.hash_bytes):
+                    f.seek(start)
+                    digest.update(f.read(self.hash_bytes))
+        return digest.hexdigest()
+
+    def key(self, file_name, **processor_kwargs):
+        # lazy/memmap only change how the data is opened, not what it is
+        options = {k: v for k, v in processor_kwargs.items() if k not in ('lazy', 'memmap')}
+        if options.get('dtype', 'auto') == 'auto': # same resolution as HDF5SignalProcessor
+            options['dtype'] = None if processor_kwargs.get('memmap') else 'float'
+        stat = os.stat(file_name)
+        source = {'path': os.path.abspath(file_name), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                  'hash': self.content_hash(file_name), 'options': repr(sorted(options.items()))}
+        return hashlib.blake2b(json.dumps(source, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+    def load(self, file_name, lazy=True, **processor_kwargs):
+        """
+        Return the signals of file_name, from the cache when possible.
+        Parameters:
+        - lazy: open the cached .hspy files lazily (default True)
+        - processor_kwargs: HDF5SignalProcessor options (dtype=...), part of the cache key
+        """
+        entry = os.path.join(self.cache_dir, self.key(file_name, **processor_kwargs))
+        if not os.path.isdir(entry):
+            self.store(file_name, entry, **processor_kwargs)
+        os.utime(entry) # mtime of the entry directory is the LRU clock
+        with open(os.path.join(entry, 'signals.json')) as f:
+            names = json.load(f)
+        return [hs.load(os.path.join(entry, f'{i}.hspy'), lazy=lazy) for i in range(len(names))]
+
+    def store(self, file_name, entry, **processor_kwargs):
+        # Convert lazily so the source cube is streamed into the cache chunk by chunk,
+        # and write into a temporary directory renamed at the end so readers never see half an entry
+        processor_kwargs = {k: v for k, v in processor_kwargs.items() if k not in ('lazy', 'memmap')}
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            with HDF5SignalProcessor(file_name, lazy=True, **processor_kwargs) as processor:
+                for i, signal in enumerate(processor.get_signals()):
+                    signal.save(os.path.join(tmp, f'{i}.hspy'), compression='gzip', show_progressbar=False)
+                with open(os.path.join(tmp, 'signals.json'), 'w') as f:
+                    json.dump(processor.signal_names, f)
+            try:
+                os.rename(tmp, entry)
+            except OSError: # another process stored the same entry first
+                shutil.rmtree(tmp, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=entry)
+
+    def entries(self):
+        # (last use, size in bytes, path) of every complete entry
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.tmp-') or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(root, file))
+                       for root, _, files in os.walk(path) for file in files)
+            entries.append((os.path.getmtime(path), size, path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        # Drop least recently used entries until the cache fits in max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+"""
+Example use:
+cache = EDAXCache()
+signals = cache.load('Cu-SS.h5', dtype='float32')  # LazyEDSSEMSpectrum list, read from the cache on later calls
+"""
\ No newline at end of file
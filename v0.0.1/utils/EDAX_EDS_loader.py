@@ -2,60 +2,262 @@
 #!pip install hyperspy
 #!pip update h5py
 #!pip install exspy
-import hyperspy.api as hs
 import numpy as np
-import matplotlib.pyplot as plt
 import h5py
-import seaborn as sns
-import ipywidgets as widgets
-from IPython.display import display
-import pandas as pd
-import tkinter as tk
-from tkinter import messagebox
-import exspy
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .._lazy import LazyModule
+
+# Heavy dependencies, imported on first use
+hs = LazyModule('hyperspy.api')
+exspy = LazyModule('exspy')
+da = LazyModule('dask.array')
+pd = LazyModule('pandas')
+
+# Dataset name endings of one EDAX field of view
+EDAX_SUFFIXES = ('SPD', 'SPC', 'MAPIMAGEIPR', 'HOSTPARAMS')
+
+# metadata node <- HOSTPARAMS field
+HOSTPARAMS_METADATA = {
+    'Acquisition_instrument.SEM.Stage.x': 'StageXPosition',
+    'Acquisition_instrument.SEM.Stage.y': 'StageYPosition',
+    'Acquisition_instrument.SEM.Stage.z': 'StageZPosition',
+    'Acquisition_instrument.SEM.Stage.tilt_alpha': 'Tilt',
+    'Acquisition_instrument.SEM.Stage.rotation': 'Rotation',
+    'Acquisition_instrument.SEM.magnification': 'Magnification',
+    'Acquisition_instrument.SEM.working_distance': 'WD',
+    'Acquisition_instrument.SEM.beam_current': 'BeamCurrent',
+    'Acquisition_instrument.SEM.beam_energy': 'KV',
+}
 
 class HDF5SignalProcessor:
-    def __init__(self, file_name):
+    def __init__(self, file_name, lazy=False, dtype='auto', memmap=False, energy_range=None, binning=None):
+        """
+        Parameters:
+        - file_name: path of the EDAX .h5 file
+        - lazy: if True, SPD datasets are wrapped in dask arrays following the on-disk chunking
+                and returned as LazyEDSSEMSpectrum. No pixel data is read until computation,
+                so the file stays open until close() is called.
+        - dtype: dtype of the signal data. 'float' (float64) is the historical default,
+                 'float32' halves that, None keeps the native integer counts.
+                 'auto' (default) is 'float', or None when memmap=True so the map is not defeated.
+                 The conversion happens while reading (h5py converts into the output buffer),
+                 so only one copy of the data is ever held. With lazy=True it is applied
+                 chunk by chunk at compute time.
+        - memmap: if True, SPD datasets stored contiguous and uncompressed are mapped straight from
+                  the file with np.memmap (read-only, pages shared through the OS cache).
+                  Only used when no conversion is needed (dtype=None or the on-disk dtype),
+                  otherwise the normal read is used and a notice is printed.
+        - energy_range: (start, end) in keV. Only the channels in that range are read, translated
+                        with the evPch of the SPC dataset; the energy axis offset follows the crop.
+        - binning: int, or (y, x) factors. Pixels are summed in bins while reading, block by block,
+                   so only the binned cube is ever held. Edge rows/columns that do not fill a bin are dropped.
+        """
         self.file_name = file_name
+        self.lazy = lazy
+        if dtype == 'auto':
+            dtype = None if memmap else 'float'
+        self.dtype = dtype
+        self.memmap = memmap
+        self.energy_range = energy_range
+        if binning is None:
+            binning = (1, 1)
+        elif np.isscalar(binning):
+            binning = (int(binning), int(binning))
+        self.binning = tuple(int(b) for b in binning)
+        self.channels = {} # SPD dataset name -> (first, stop) channels read
         self.signals = []
         self.signal_names = []
+        self.signal_lookup = {} # SPD dataset name -> signal
+        self.index = {}
+        self.h5file = None
         self.process_file()
 
     def process_file(self):
-        with h5py.File(self.file_name, 'r') as f:
-            # Process datasets ending with 'SPD'
-            f.visititems(self.get_SPD)
+        f = h5py.File(self.file_name, 'r')
+        try:
+            # One walk over the tree, then every partner dataset is a dictionary lookup
+            self.index = self.build_index(f)
+            for prefix, entry in self.index.items():
+                if 'SPD' not in entry:
+                    for suffix, name in entry.items():
+                        print(f"No corresponding signal found for {name}")
+                    continue
+                # Process datasets ending with 'SPD'
+                self.get_SPD(entry['SPD'], f[entry['SPD']])
+
+                # Process datasets ending with 'MAPIMAGEIPR', 'SPC' and 'HOSTPARAMS'
+                if 'MAPIMAGEIPR' in entry:
+                    self.get_MicronsPerPixelX(entry['MAPIMAGEIPR'], f[entry['MAPIMAGEIPR']])
+                if 'SPC' in entry:
+                    self.get_SPC(entry['SPC'], f[entry['SPC']])
+                if 'HOSTPARAMS' in entry:
+                    self.get_HOSTPARAMS(entry['HOSTPARAMS'], f[entry['HOSTPARAMS']])
+        except BaseException:
+            f.close() # the constructor fails, nothing could close the handle later
+            raise
+        if self.lazy:
+            self.h5file = f # lazy signals read from this handle, keep it open
+        else:
+            f.close()
+
+    @staticmethod
+    def build_index(f):
+        """
+        Walk the HDF5 tree once and group the EDAX datasets by the path they share.
+        Returns a dict like {'Sample 1/Area 1/Live Map 1/': {'SPD': name, 'SPC': name, ...}}
+        where the key is the dataset name with its suffix removed.
+        """
+        index = {}
+        def visit(name, obj):
+            if isinstance(obj, h5py.Dataset):
+                for suffix in EDAX_SUFFIXES:
+                    if name.endswith(suffix):
+                        index.setdefault(name[:-len(suffix)], {})[suffix] = name
+                        break
+        f.visititems(visit)
+        return index
 
-            # Process datasets ending with 'MAPIMAGEIPR'
-            f.visititems(self.get_MicronsPerPixelX)
+    def find_signal(self, name, suffix):
+        # O(1) lookup of the signal loaded from the SPD sitting next to dataset 'name'
+        return self.signal_lookup.get(name[:-len(suffix)] + 'SPD')
 
-            # Process datasets ending with 'SPC'
-            f.visititems(self.get_SPC)
+    def close(self):
+        # Release the HDF5 handle kept open by lazy signals
+        if self.h5file is not None:
+            self.h5file.close()
+            self.h5file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def get_SPD(self, name, obj):
         if isinstance(obj, h5py.Dataset) and name.endswith('SPD'):
             #print(f"Dataset: {name}, shape: {obj.shape}, dtype: {obj.dtype}")
 
-            # Load the data
-            data = obj[()]
-            data_shape = data.shape
-
-            # data = data.reshape((data_shape[0], data_shape[1], data_shape[2]))
+            channels, energy_offset = self.channel_range(name, obj)
+            if self.lazy:
+                # Wrap the dataset without reading it, one dask chunk per HDF5 chunk
+                chunks = obj.chunks if obj.chunks is not None else 'auto'
+                data = da.from_array(obj, chunks=chunks)[:, :, channels[0]:channels[1]]
+                if self.binning != (1, 1):
+                    by, bx = self.binning
+                    data = da.coarsen(np.sum, data, {0: by, 1: bx}, trim_excess=True)
+                    if self.dtype is None and np.issubdtype(obj.dtype, np.integer):
+                        data = data.astype(np.promote_types(obj.dtype, np.uint32)) # same as the eager read
+                if self.dtype is not None:
+                    data = data.astype(self.dtype) # converted per chunk when computed
+                signal = exspy.signals.LazyEDSSEMSpectrum(data)
+            else:
+                # Load the data
+                data = self.read_SPD(obj, channels)
 
-            # Create a HyperSpy Signal1D object just like my previous code
-            signal = exspy.signals.EDSSEMSpectrum(data)
-            signal.change_dtype('float')
+                # Create a HyperSpy Signal1D object just like my previous code
+                signal = exspy.signals.EDSSEMSpectrum(data)
             signal.axes_manager[0].name = 'x'
             signal.axes_manager[0].units = 'um'
             signal.axes_manager[1].name = 'y'
             signal.axes_manager[1].units = 'um'
             signal.axes_manager[2].name = 'Energy'
             signal.axes_manager[2].units = 'keV'
-            signal.axes_manager[2].offset = 0
+            signal.axes_manager[2].offset = energy_offset
             signal.metadata.General.title = name
             signal.metadata.Signal.signal_type = 'EDS_SEM'
             self.signals.append(signal) # now you can update the signal globally
             self.signal_names.append(name)  # Keep track of signal names
+            self.signal_lookup[name] = signal
+            self.channels[name] = channels
+
+    def channel_range(self, name, obj):
+        # energy_range (keV) -> ((first, stop) channels, energy of the first channel),
+        # using the evPch of the SPC dataset next to this SPD
+        n_channels = obj.shape[2]
+        if self.energy_range is None:
+            return (0, n_channels), 0
+        spc_name = self.index.get(name[:-len('SPD')], {}).get('SPC')
+        if spc_name is None:
+            print(f"No SPC found for {name}, energy_range ignored")
+            return (0, n_channels), 0
+        scale = _first_value(obj.file[spc_name]['evPch']) / 1000 # keV per channel
+        start, end = self.energy_range
+        first = min(max(int(np.floor(start / scale)), 0), n_channels)
+        stop = min(max(int(np.ceil(end / scale)) + 1, first), n_channels)
+        return (first, stop), first * scale
+
+    def default_block_rows(self, obj):
+        # Rows per read: one HDF5 chunk of rows, or about 64 MB for contiguous data
+        if obj.chunks is not None:
+            return obj.chunks[0]
+        row_bytes = obj.shape[1] * obj.shape[2] * obj.dtype.itemsize
+        return max(1, (64 * 2**20) // max(row_bytes, 1))
+
+    def iter_SPD_blocks(self, obj, channels, dtype=None, block_rows=None):
+        """
+        Yield (row, block) over the SPD dataset: hyperslabs of whole rows restricted to
+        channels = (first, stop), binned with self.binning. 'row' is the first output (binned) row
+        of the block. The read buffer is reused, so consume each block before asking for the next.
+        """
+        by, bx = self.binning
+        first, stop = channels
+        dtype = obj.dtype if dtype is None else np.dtype(dtype)
+        n_rows, n_cols = obj.shape[0] // by * by, obj.shape[1] // bx * bx
+        if block_rows is None:
+            block_rows = self.default_block_rows(obj)
+        step = max(by, block_rows // by * by)
+        # h5py converts to dtype while reading when there is nothing to sum
+        buffer_dtype = dtype if (by, bx) == (1, 1) else obj.dtype
+        buffer = np.empty((min(step, n_rows), n_cols, stop - first), dtype=buffer_dtype)
+        if buffer.size == 0:
+            return
+        for r0 in range(0, n_rows, step):
+            r1 = min(r0 + step, n_rows)
+            block = buffer[:r1 - r0]
+            obj.read_direct(block, np.s_[r0:r1, :n_cols, first:stop], np.s_[0:r1 - r0])
+            if (by, bx) != (1, 1):
+                block = block.reshape((r1 - r0) // by, by, n_cols // bx, bx, stop - first).sum(axis=(1, 3), dtype=dtype)
+            yield r0 // by, block
+
+    def read_SPD(self, obj, channels=None):
+        first, stop = (0, obj.shape[2]) if channels is None else channels
+        binned = self.binning != (1, 1)
+        if self.memmap and not binned:
+            data = self.memmap_SPD(obj)
+            if data is not None:
+                return data[:, :, first:stop] # still a view of the file
+        # Read straight into a buffer of the requested dtype instead of obj[()] + change_dtype,
+        # which would hold the native counts and the converted copy at the same time
+        dtype = obj.dtype if self.dtype is None else np.dtype(self.dtype)
+        if not binned:
+            data = np.empty(obj.shape[:2] + (stop - first,), dtype=dtype)
+            if data.size:
+                obj.read_direct(data, np.s_[:, :, first:stop])
+            return data
+        if np.issubdtype(dtype, np.integer):
+            dtype = np.promote_types(dtype, np.uint32) # a bin sums several pixels of counts
+        by, bx = self.binning
+        data = np.empty((obj.shape[0] // by, obj.shape[1] // bx, stop - first), dtype=dtype)
+        for row, block in self.iter_SPD_blocks(obj, (first, stop), dtype=dtype):
+            data[row:row + len(block)] = block
+        return data
+
+    def memmap_SPD(self, obj):
+        # Zero-copy view of the dataset bytes, or None when the layout does not allow it
+        if obj.chunks is not None or obj.dtype.fields is not None or obj.size == 0:
+            reason = 'chunked or compound layout' # chunked (maybe compressed) or compound data
+        elif self.dtype is not None and np.dtype(self.dtype) != obj.dtype:
+            reason = f'dtype {np.dtype(self.dtype)} needs a conversion from {obj.dtype}' # a conversion copies anyway
+        elif obj.file.driver != 'sec2' or obj.external:
+            reason = 'not a plain file'
+        elif obj.id.get_offset() is None:
+            reason = 'storage never allocated'
+        else:
+            return np.memmap(self.file_name, mode='r', dtype=obj.dtype, shape=obj.shape, offset=obj.id.get_offset())
+        print(f"memmap skipped for {obj.name} ({reason}), reading into memory")
+        return None
 
     def get_MicronsPerPixelX(self, name, obj):
         if isinstance(obj, h5py.Dataset) and name.endswith('MAPIMAGEIPR'):
@@ -66,13 +268,12 @@ class HDF5SignalProcessor:
                 microns_per_pixel_x = obj['MicronsPerPixelX'][()]
                 #print('Scale in navigation axis =', microns_per_pixel_x)
 
-                # Find the corresponding signal index
-                corresponding_signal_name = name.replace('MAPIMAGEIPR', 'SPD')
-                if corresponding_signal_name in self.signal_names:
-                    idx = self.signal_names.index(corresponding_signal_name)
-                    self.signals[idx].axes_manager[0].scale = microns_per_pixel_x
-                    self.signals[idx].axes_manager[1].scale = microns_per_pixel_x
-                    #print(f"Set scales for signal {corresponding_signal_name}")
+                # Find the corresponding signal
+                signal = self.find_signal(name, 'MAPIMAGEIPR')
+                if signal is not None:
+                    signal.axes_manager[0].scale = microns_per_pixel_x * self.binning[1]
+                    signal.axes_manager[1].scale = microns_per_pixel_x * self.binning[0]
+                    #print(f"Set scales for signal {name}")
                 else:
                     print(f"No corresponding signal found for {name}")
             except Exception as e:
@@ -86,12 +287,11 @@ class HDF5SignalProcessor:
                 ev_pch = obj['evPch'][()]
                 #print('evPch:', ev_pch)
 
-                # Find the corresponding signal index
-                corresponding_signal_name = name.replace('SPC', 'SPD')
-                if corresponding_signal_name in self.signal_names:
-                    idx = self.signal_names.index(corresponding_signal_name)
-                    self.signals[idx].axes_manager[2].scale = ev_pch / 1000  # Convert to kV
-                    #print(f"Set energy scale for signal {corresponding_signal_name}")
+                # Find the corresponding signal
+                signal = self.find_signal(name, 'SPC')
+                if signal is not None:
+                    signal.axes_manager[2].scale = ev_pch / 1000  # Convert to kV
+                    #print(f"Set energy scale for signal {name}")
                 else:
                     print(f"No corresponding signal found for {name}")
             except Exception as e:
@@ -101,23 +301,16 @@ class HDF5SignalProcessor:
             #print(f"Dataset: {name}, shape: {obj.shape}, dtype: {obj.dtype}")
             try:
                 # Extract metadata values from HOSTPARAMS
-                host_params = obj[0]  # Assuming it's a structured array with one element
-
-                # Find the corresponding signal index
-                parent_path = obj.parent.name
-                corresponding_signal_name = None
-                for signal_name, signal_path in self.signal_paths.items():
-                    if signal_path == parent_path:
-                        corresponding_signal_name = signal_name
-                        break
-
-                if corresponding_signal_name is not None:
-                    idx = self.signal_names.index(corresponding_signal_name)
-                    signal = self.signals[idx]
+                host_params = obj[()]
+                if host_params.shape:
+                    host_params = host_params[0]  # structured array with one element
 
+                # Find the corresponding signal
+                signal = self.find_signal(name, 'HOSTPARAMS')
+                if signal is not None:
                     # Populate metadata from HOSTPARAMS
                     self.populate_metadata_from_HOSTPARAMS(signal, host_params)
-                    #print(f"Set metadata for signal {corresponding_signal_name}")
+                    #print(f"Set metadata for signal {name}")
                 else:
                     print(f"No corresponding signal found for {name}")
             except Exception as e:
@@ -136,15 +329,9 @@ class HDF5SignalProcessor:
 
     def populate_metadata_from_HOSTPARAMS(self, signal, host_params):
         # Populate metadata fields from HOSTPARAMS dataset
-        signal.metadata.Acquisition_instrument.SEM.Stage.x = host_params['StageXPosition']
-        signal.metadata.Acquisition_instrument.SEM.Stage.y = host_params['StageYPosition']
-        signal.metadata.Acquisition_instrument.SEM.Stage.z = host_params['StageZPosition']
-        signal.metadata.Acquisition_instrument.SEM.Stage.tilt_alpha = host_params['Tilt']
-        signal.metadata.Acquisition_instrument.SEM.Stage.rotation = host_params['Rotation']
-        signal.metadata.Acquisition_instrument.SEM.magnification = host_params['Magnification']
-        signal.metadata.Acquisition_instrument.SEM.working_distance = host_params['WD']
-        signal.metadata.Acquisition_instrument.SEM.beam_current = host_params['BeamCurrent']
-        signal.metadata.Acquisition_instrument.SEM.beam_energy = host_params['KV']
+        # set_item creates the missing Acquisition_instrument nodes on a fresh signal
+        for item, field in HOSTPARAMS_METADATA.items():
+            signal.metadata.set_item(item, float(host_params[field]))
         # Add more fields as necessary based on available data
 
     def get_signals(self):
@@ -153,10 +340,254 @@ class HDF5SignalProcessor:
     def plot_signals(self):
         for signal in self.signals:
             signal.plot()
+
+    def reduce_SPD(self, name=None, reductions=('sum', 'max', 'total'), lines=None, block_rows=None):
+        """
+        Compute several reductions of an SPD cube in one streaming pass over the file,
+        holding one block of rows in memory at a time (maps larger than RAM work).
+        Open the processor with lazy=True so the cube is not loaded first.
+        Parameters:
+        - name: SPD dataset name (default: the first one in signal_names)
+        - reductions: any of 'sum' (sum spectrum), 'max' (max-pixel spectrum), 'total' (total-count map)
+        - lines: dict of energy windows in keV, e.g. {'Fe_Ka': (6.2, 6.6)}, one intensity map per line
+        - block_rows: rows of pixels read per block (default: the dataset chunk rows, or ~64 MB)
+        energy_range and binning of the processor apply, so the results match the loaded signal.
+        Returns:
+        - dict of signals keyed by reduction name and line name
+        """
+        if name is None:
+            name = self.signal_names[0]
+        lines = {} if lines is None else lines
+        unknown = set(reductions) - {'sum', 'max', 'total'}
+        if unknown:
+            raise ValueError(f"Unknown reductions {sorted(unknown)}, use 'sum', 'max' or 'total'")
+
+        signal = self.signal_lookup[name]
+        energy_axis = signal.axes_manager[2]
+        windows = {}
+        for line, (start, end) in lines.items():
+            c0 = int(round((start - energy_axis.offset) / energy_axis.scale))
+            c1 = int(round((end - energy_axis.offset) / energy_axis.scale)) + 1
+            windows[line] = (max(c0, 0), min(c1, energy_axis.size))
+
+        f = self.h5file if self.h5file is not None else h5py.File(self.file_name, 'r')
+        try:
+            obj = f[name]
+            channels = self.channels[name]
+            n_rows, n_cols = obj.shape[0] // self.binning[0], obj.shape[1] // self.binning[1]
+            n_channels = channels[1] - channels[0]
+            acc_dtype = np.int64 if np.issubdtype(obj.dtype, np.integer) else np.float64
+            # blocks come out native when nothing is summed while reading, no need for a wider copy
+            block_dtype = obj.dtype if self.binning == (1, 1) else acc_dtype
+
+            sum_spectrum = np.zeros(n_channels, dtype=acc_dtype)
+            max_spectrum = np.zeros(n_channels, dtype=block_dtype)
+            total_map = np.zeros((n_rows, n_cols), dtype=acc_dtype)
+            line_maps = {line: np.zeros((n_rows, n_cols), dtype=acc_dtype) for line in windows}
+
+            for r0, block in self.iter_SPD_blocks(obj, channels, dtype=block_dtype, block_rows=block_rows):
+                r1 = r0 + len(block)
+                if 'sum' in reductions:
+                    sum_spectrum += block.sum(axis=(0, 1), dtype=acc_dtype)
+                if 'max' in reductions:
+                    np.maximum(max_spectrum, block.max(axis=(0, 1)), out=max_spectrum)
+                if 'total' in reductions:
+                    total_map[r0:r1] = block.sum(axis=2, dtype=acc_dtype)
+                for line, (c0, c1) in windows.items():
+                    line_maps[line][r0:r1] = block[:, :, c0:c1].sum(axis=2, dtype=acc_dtype)
+        finally:
+            if f is not self.h5file:
+                f.close()
+
+        results = {}
+        if 'sum' in reductions:
+            results['sum'] = self._spectrum_like(signal, sum_spectrum, 'sum spectrum')
+        if 'max' in reductions:
+            results['max'] = self._spectrum_like(signal, max_spectrum, 'max-pixel spectrum')
+        if 'total' in reductions:
+            results['total'] = self._map_like(signal, total_map, 'total counts')
+        for line, line_map in line_maps.items():
+            results[line] = self._map_like(signal, line_map, line)
+        return results
+
+    @staticmethod
+    def _spectrum_like(signal, data, title):
+        # 1D EDS spectrum carrying the energy calibration of 'signal'
+        spectrum = exspy.signals.EDSSEMSpectrum(data)
+        energy_axis = signal.axes_manager[2]
+        axis = spectrum.axes_manager[0]
+        axis.name, axis.units = energy_axis.name, energy_axis.units
+        axis.scale, axis.offset = energy_axis.scale, energy_axis.offset
+        spectrum.metadata.General.title = f"{signal.metadata.General.title} {title}"
+        return spectrum
+
+    @staticmethod
+    def _map_like(signal, data, title):
+        # 2D image carrying the x/y calibration of 'signal'
+        image = hs.signals.Signal2D(data)
+        for i in range(2):
+            axis, source = image.axes_manager[i], signal.axes_manager[i]
+            axis.name, axis.units = source.name, source.units
+            axis.scale, axis.offset = source.scale, source.offset
+        image.metadata.General.title = f"{signal.metadata.General.title} {title}"
+        return image
+def _load_one(file_name, processor_kwargs, as_dict=True):
+    # Parse one file and report instead of raising,
+    # so a corrupt file shows up in the manifest rather than killing the batch.
+    # From a worker process the signals are sent back as dictionaries because HyperSpy signals do not pickle
+    start = time.perf_counter()
+    try:
+        processor = HDF5SignalProcessor(file_name, **processor_kwargs)
+        signals = processor.get_signals()
+        if as_dict:
+            signals = [signal._to_dictionary() for signal in signals]
+        names, error = processor.signal_names, None
+    except Exception as e:
+        signals, names, error = [], [], f"{type(e).__name__}: {e}"
+    return signals, names, time.perf_counter() - start, error
+
+def _expand_files(files):
+    # glob pattern (** matches any depth) -> sorted paths, list -> paths as given
+    if isinstance(files, str):
+        files = sorted(glob.glob(files, recursive=True))
+    return [str(file_name) for file_name in files]
+
+def load_batch(files, workers=None, **processor_kwargs):
+    """
+    Parse many EDAX .h5 files with HDF5SignalProcessor in a process pool.
+    Parameters:
+    - files: glob pattern (e.g. 'session/*.h5') or list of paths
+    - workers: number of worker processes (None = number of CPUs, 1 = no pool)
+    - processor_kwargs: passed to HDF5SignalProcessor (dtype=...). lazy=True is parsed in this
+                        process since lazy signals hold an open file handle that cannot be sent back.
+    Returns:
+    - signals: flat list of signals, in file order (sorted for a glob, as given for a list)
+               and dataset order within each file
+    - manifest: DataFrame with one row per file: file, n_signals, signal_names, seconds, error
+    """
+    files = _expand_files(files)
+
+    if workers == 1 or processor_kwargs.get('lazy', False):
+        results = [_load_one(file_name, processor_kwargs, as_dict=False) for file_name in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_load_one, file_name, processor_kwargs) for file_name in files]
+            results = []
+            for future in futures: # collected in submission order -> deterministic output
+                try:
+                    dicts, names, seconds, error = future.result()
+                    signal_class = exspy.signals.EDSSEMSpectrum
+                    results.append(([signal_class(**d) for d in dicts], names, seconds, error))
+                except Exception as e: # worker died (e.g. crashed in the HDF5 library)
+                    results.append(([], [], float('nan'), f"{type(e).__name__}: {e}"))
+
+    signals = []
+    rows = []
+    for file_name, (file_signals, names, seconds, error) in zip(files, results):
+        signals.extend(file_signals)
+        rows.append({'file': file_name, 'n_signals': len(file_signals), 'signal_names': names,
+                     'seconds': seconds, 'error': error})
+        if error is not None:
+            print(f"Error loading {file_name}: {error}")
+    manifest = pd.DataFrame(rows, columns=['file', 'n_signals', 'signal_names', 'seconds', 'error'])
+    return signals, manifest
+
+def _first_value(value):
+    # Scalar out of a scalar or one-element dataset field
+    value = np.asarray(value).ravel()
+    return value[0].item() if value.size else np.nan
+
+def scan_file(file_name):
+    """
+    Catalog one EDAX .h5 file without reading any SPD pixel data: only the dataset headers
+    and the small SPC, MAPIMAGEIPR and HOSTPARAMS datasets are touched.
+    Returns a list of dicts, one per SPD dataset, with file, name, shape, dtype, chunks,
+    compression, MicronsPerPixelX, evPch and every numeric HOSTPARAMS field (KV, Magnification, ...).
+    """
+    rows = []
+    with h5py.File(file_name, 'r') as f:
+        index = HDF5SignalProcessor.build_index(f)
+        for prefix, entry in index.items():
+            if 'SPD' not in entry:
+                continue
+            spd = f[entry['SPD']]
+            row = {'file': str(file_name), 'name': entry['SPD'], 'shape': spd.shape, 'dtype': str(spd.dtype),
+                   'chunks': spd.chunks, 'compression': spd.compression,
+                   'MicronsPerPixelX': np.nan, 'evPch': np.nan}
+            try:
+                if 'MAPIMAGEIPR' in entry:
+                    row['MicronsPerPixelX'] = _first_value(f[entry['MAPIMAGEIPR']]['MicronsPerPixelX'])
+                if 'SPC' in entry:
+                    row['evPch'] = _first_value(f[entry['SPC']]['evPch'])
+                if 'HOSTPARAMS' in entry:
+                    host_params = f[entry['HOSTPARAMS']][()]
+                    for field in host_params.dtype.names or ():
+                        if np.issubdtype(host_params.dtype[field].base, np.number):
+                            row[field] = _first_value(host_params[field])
+            except Exception as e:
+                print(f"Error accessing {prefix}: {e}")
+            rows.append(row)
+    return rows
+
+def _scan_one(file_name):
+    start = time.perf_counter()
+    try:
+        rows, error = scan_file(file_name), None
+    except Exception as e:
+        rows, error = [], f"{type(e).__name__}: {e}"
+    return rows, time.perf_counter() - start, error
+
+def scan_files(files, workers=None):
+    """
+    Metadata-only catalog of many EDAX .h5 files, scanned in a process pool.
+    Parameters:
+    - files: glob pattern or list of paths (same rules as load_batch)
+    - workers: number of worker processes (None = number of CPUs, 1 = no pool)
+    Returns:
+    - DataFrame with one row per SPD dataset (see scan_file), plus 'seconds' and 'error' columns.
+      A file that cannot be read gets a single row with its error.
+    """
+    files = _expand_files(files)
+    if workers == 1:
+        results = [_scan_one(file_name) for file_name in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_one, files))
+
+    rows = []
+    for file_name, (file_rows, seconds, error) in zip(files, results):
+        if error is not None:
+            print(f"Error scanning {file_name}: {error}")
+            rows.append({'file': file_name, 'seconds': seconds, 'error': error})
+        for row in file_rows:
+            rows.append({**row, 'seconds': seconds, 'error': None})
+    return pd.DataFrame(rows)
+
 """
 example use:
 file_name = 'Cu-SS.h5'
 processor = HDF5SignalProcessor(file_name)
 signals = processor.get_signals()
 #processor.plot_signals()
-"""
+
+lazy use (nothing is read until compute):
+with HDF5SignalProcessor(file_name, lazy=True) as processor:
+    sum_spectrum = processor.get_signals()[0].sum(axis=(0, 1)).compute()
+
+memory-mapped use (contiguous, uncompressed SPD; native counts, opens without reading):
+processor = HDF5SignalProcessor(file_name, dtype=None, memmap=True)
+
+streaming reductions (one pass, one block of rows in memory):
+with HDF5SignalProcessor(file_name, lazy=True) as processor:
+    results = processor.reduce_SPD(lines={'Fe_Ka': (6.2, 6.6), 'Cr_Ka': (5.3, 5.5)})
+    results['sum'].plot()
+
+catalog without reading any spectrum data:
+catalog = scan_files('archive/**/*.h5', workers=8)
+
+survey map: 0-20 keV only, 4x4 binned while reading:
+processor = HDF5SignalProcessor(file_name, energy_range=(0, 20), binning=4)
+
+batch use (one process per file, a corrupt file is reported in the manifest):
+signals, manifest = load_batch('session/*.h5', workers=8, dtype='float32')
+"""
\ No newline at end of file
@@ -0,0 +1,225 @@
+import numpy as np
+from ..data.xray_lines import xray_line_index, fwhm_at_energy
+
+# Line families: primary line (the one reported, as PeriodicTableApp does) and the companion lines
+# with their approximate intensity relative to the primary one
+LINE_FAMILIES = {
+    'K': ('Ka', {'Kb1': 0.13}),
+    'L': ('La', {'Lb1': 0.5, 'Lb2': 0.2}),
+    'M': ('Ma', {}),
+}
+# family whose primary line is excited too whenever this one is seen, if it is on the axis
+HIGHER_FAMILY = {'L': 'K', 'M': 'L'}
+
+def _spectrum_axis(spectrum, offset, scale):
+    # counts and (offset, scale) of the energy axis in keV
+    if hasattr(spectrum, 'axes_manager'):
+        axis = spectrum.axes_manager.signal_axes[0]
+        return np.asarray(spectrum.data, dtype=np.float64), axis.offset, axis.scale
+    if offset is None or scale is None:
+        raise ValueError("offset and scale (keV) are needed for an array spectrum")
+    return np.asarray(spectrum, dtype=np.float64), offset, scale
+
+def find_peaks(counts, offset, scale, energy_resolution_MnKa=130.0, min_significance=5.0, min_energy=0.15,
+               return_amplitudes=False):
+    """
+    Peaks of a spectrum with a zero-area top-hat filter (width ~ FWHM at Mn Ka), which removes the
+    slowly varying background; the significance is the filtered value over its Poisson noise.
+    A maximum is kept only when the filtered spectrum dips below zero on both sides within two filter
+    widths, as it does around a line. Channels within half a filter of either end are not searched.
+    Parameters:
+    - counts: 1D spectrum (counts per channel)
+    - offset, scale: energy axis in keV
+    - energy_resolution_MnKa: detector resolution in eV
+    - min_significance: peaks below this many sigma are dropped
+    - min_energy: keV, peaks below are ignored (noise peak)
+    - return_amplitudes: also return the filtered values (net counts) of the peaks
+    Returns:
+    - (energies in eV, significances), sorted by energy
+    """
+    counts = np.clip(np.asarray(counts, dtype=np.float64), 0, None)
+    width = max(int(round(fwhm_at_energy(5.8987, energy_resolution_MnKa) / scale)), 1)
+    side = max(width // 2, 1)
+    kernel = np.concatenate([np.full(side, -1 / (2 * side)), np.full(width, 1 / width), np.full(side, -1 / (2 * side))])
+    filtered = np.convolve(counts, kernel[::-1], mode='same')
+    noise = np.sqrt(np.convolve(counts, (kernel ** 2)[::-1], mode='same'))
+    significance = np.divide(filtered, noise, out=np.zeros_like(filtered), where=noise > 0)
+    # local maxima of the filtered spectrum, all channels compared at once
+    core = filtered[1:-1]
+    is_peak = (core > filtered[:-2]) & (core >= filtered[2:]) & (significance[1:-1] >= min_significance)
+    channels = np.flatnonzero(is_peak) + 1
+    # the convolution pads with zeros: within half a kernel of either end the filter sees a false edge
+    edge = len(kernel) // 2 + 1
+    channels = channels[(channels >= edge) & (channels < len(counts) - edge)]
+    # a line gives negative side lobes (about -1/2 of its height) within two filter widths on both
+    # sides; a bend of the background (e.g. at the window cut-off) gives a bump that does not dip
+    reach = 2 * width
+    lobes = [max(filtered[max(c - reach, edge):c].min(initial=np.inf),
+                 filtered[c + 1:min(c + 1 + reach, len(counts) - edge)].min(initial=np.inf)) for c in channels]
+    channels = channels[np.array(lobes, dtype=np.float64).reshape(-1) <= 0]
+    # noise splits a line into several maxima: keep the strongest within one filter width
+    order = np.argsort(-significance[channels], kind='stable')
+    kept = []
+    for c in channels[order]:
+        if all(abs(c - k) > width for k in kept):
+            kept.append(c)
+    channels = np.sort(np.array(kept, dtype=np.intp))
+    # sub-channel position from a parabola through the three filtered values
+    left, centre, right = filtered[channels - 1], filtered[channels], filtered[channels + 1]
+    curvature = left - 2 * centre + right
+    shift = np.divide(left - right, 2 * curvature, out=np.zeros_like(centre), where=curvature != 0)
+    energies = (offset + (channels + np.clip(shift, -0.5, 0.5)) * scale) * 1000
+    keep = energies >= min_energy * 1000
+    if return_amplitudes:
+        return energies[keep], significance[channels][keep], filtered[channels][keep]
+    return energies[keep], significance[channels][keep]
+
+def identify_lines(spectrum, offset=None, scale=None, energy_resolution_MnKa=130.0, min_significance=5.0,
+                   min_energy=0.15, tolerance=0.5, elements=None, return_details=False):
+    """
+    Automatic element identification on a sum spectrum: peaks are found with find_peaks and matched
+    to the x_ray_energies lines within tolerance * FWHM. Each element family (K: Ka/Kb, L: La/Lb1/Lb2,
+    M: Ma) is scored from its primary peak, plus the companion peaks it explains, minus those it
+    predicts but that are missing, plus half the score of the element's other families.
+    Companion heights are compared in net counts: a companion may not be more than twice its expected
+    height (plus 3 sigma), nor take a peak taller than expected that is a better primary line of
+    another element.
+    An L (M) family is penalised when the K (L) family of the element is on the axis but not accepted.
+    Families are accepted best first, each peak explaining one family.
+    Parameters:
+    - spectrum: HyperSpy 1D signal (e.g. the 'sum' of HDF5SignalProcessor.reduce_SPD) or array
+    - offset, scale: energy axis in keV, for an array spectrum
+    - energy_resolution_MnKa: detector resolution in eV
+    - min_significance, min_energy: see find_peaks
+    - tolerance: matching window in units of the detector FWHM at each peak
+    - elements: optional list of symbols the candidates are restricted to
+    - return_details: also return the list of accepted (line, peak energy eV, score)
+    Returns:
+    - x_ray_lines in the PeriodicTableApp format, e.g. ['O_Ka', 'Al_Ka'], sorted by energy
+    """
+    counts, offset, scale = _spectrum_axis(spectrum, offset, scale)
+    peaks, significance, amplitude = find_peaks(counts, offset, scale, energy_resolution_MnKa, min_significance,
+                                                min_energy, return_amplitudes=True)
+    # filter noise at each peak, in counts
+    noise = np.divide(amplitude, significance, out=np.sqrt(np.abs(amplitude)) + 1, where=significance > 0)
+    index = xray_line_index()
+    max_energy = (offset + len(counts) * scale) * 1000
+    fwhm = fwhm_at_energy(peaks / 1000, energy_resolution_MnKa) * 1000
+    peak, entry = index.query_many(peaks, tolerance * fwhm)
+
+    # nearest peak and its quality (significance * closeness) for every matched (element, line)
+    matches = {}
+    closeness = 1 - np.abs(index.energies[entry] - peaks[peak]) / (tolerance * fwhm[peak])
+    quality = significance[peak] * (0.5 + 0.5 * closeness)
+    for p, e, q in zip(peak.tolist(), entry.tolist(), quality.tolist()):
+        key = (str(index.elements[e]), str(index.lines[e]))
+        if key not in matches or q > matches[key][1]:
+            matches[key] = (p, q)
+
+    # lines closer than the filter width of find_peaks end up in one peak
+    filter_width = fwhm_at_energy(5.8987, energy_resolution_MnKa) * 1000
+    allowed = None if elements is None else set(elements)
+    families = {primary: family for family, (primary, _) in LINE_FAMILIES.items()}
+    # quality of each peak as the primary line of each element
+    primary_quality = {}
+    for (element, line), (p, q) in matches.items():
+        if line in families and (allowed is None or element in allowed):
+            primary_quality.setdefault(p, {})[element] = q
+
+    candidates = []
+    for (element, line), (p, q) in matches.items():
+        family = families.get(line)
+        if family is None or (allowed is not None and element not in allowed):
+            continue
+        score, explained = q, [p]
+        primary_energy = index.lookup[f"{element}_{line}"]
+        resolution = fwhm_at_energy(primary_energy / 1000, energy_resolution_MnKa) * 1000
+        merged = max(resolution, filter_width)
+        blend = [(primary_energy, 1.0)] # lines merged in the primary peak, with their weights
+        for companion, ratio in LINE_FAMILIES[family][1].items():
+            energy = index.lookup.get(f"{element}_{companion}")
+            if energy is None or energy > max_energy:
+                continue
+            if abs(energy - primary_energy) < merged:
+                blend.append((energy, ratio))
+                continue # not resolved from the primary line: neither seen nor missing
+            expected = amplitude[p] * ratio
+            match = matches.get((element, companion))
+            if match is None:
+                if expected >= 2 * min_significance * noise[p]:
+                    score -= expected / noise[p] # expected to be clearly visible, but absent
+                continue
+            cp, cq = match
+            if cp == p:
+                continue # not resolved from the primary line
+            rival = max((rq for other, rq in primary_quality.get(cp, {}).items() if other != element), default=0)
+            if amplitude[cp] > 2 * expected + 3 * noise[cp]:
+                continue # much stronger than expected: another element's line
+            if rival > cq and amplitude[cp] > expected + 3 * noise[cp]:
+                continue # taller than this companion and a better primary line of another element
+            score += cq # a separate peak of about the expected height
+            explained.append(cp)
+        if len(blend) > 1:
+            # the maximum of unresolved lines is pulled towards the companions: Gaussians of the
+            # detector resolution, widened by the filter, summed on a 1 eV grid
+            sigma = np.sqrt((resolution / 2.3548) ** 2 + filter_width ** 2 / 12)
+            grid = np.arange(primary_energy - merged, primary_energy + merged, 1.0)
+            profile = sum(w * np.exp(-0.5 * ((grid - e) / sigma) ** 2) for e, w in blend)
+            closeness = 1 - abs(grid[np.argmax(profile)] - peaks[p]) / (tolerance * fwhm[p])
+            score += significance[p] * (0.5 + 0.5 * max(closeness, 0)) - q
+        # the higher-energy family of the element must be seen too when it is on the axis
+        higher = HIGHER_FAMILY.get(family)
+        energy = None if higher is None else index.lookup.get(f"{element}_{LINE_FAMILIES[higher][0]}")
+        needs = (element, higher) if energy is not None and energy <= max_energy else None
+        candidates.append((score, f"{element}_{line}", p, explained, (element, family), needs))
+
+    # Families are accepted best first, each peak explaining one family. The score of a family gets
+    # half the score of the element's other accepted families (an element seen through several families
+    # is more likely), and loses its primary significance when the higher family it needs was not
+    # accepted; both depend on the outcome, so acceptance is repeated until it is stable.
+    accepted_families = {c[4] for c in candidates if c[0] > 0}
+    for _ in range(5):
+        element_score = {}
+        for score, _, _, _, key, _ in candidates:
+            if key in accepted_families:
+                element_score[key[0]] = element_score.get(key[0], 0) + max(score, 0)
+        ranked = []
+        for score, x_ray_line, p, explained, key, needs in candidates:
+            own = max(score, 0) if key in accepted_families else 0
+            total = score + 0.5 * (element_score.get(key[0], 0) - own)
+            if needs is not None and needs not in accepted_families:
+                total -= significance[p]
+            ranked.append((total, x_ray_line, p, explained, key, needs))
+        # peaks of an L/M family whose higher family is accepted: the element is confirmed there,
+        # so a competing element seen through this single line only does not take the peak
+        confirmed = {r[2] for r, c in zip(ranked, candidates) if r[0] > 0 and c[5] is not None and c[5] in accepted_families}
+        families_of = {}
+        for element, family in accepted_families:
+            families_of[element] = families_of.get(element, 0) + 1
+        claimed = set()
+        accepted = []
+        families_now = set()
+        for total, x_ray_line, p, explained, key, needs in sorted(ranked, key=lambda c: -c[0]):
+            if total <= 0 or p in claimed:
+                continue
+            single = len(explained) == 1 and families_of.get(key[0], 0) - (key in accepted_families) == 0
+            if p in confirmed and single and (needs is None or needs not in accepted_families):
+                continue
+            claimed.update(explained)
+            accepted.append((x_ray_line, float(peaks[p]), float(total)))
+            families_now.add(key)
+        if families_now == accepted_families:
+            break
+        accepted_families = families_now
+    accepted.sort(key=lambda a: a[1])
+    x_ray_lines = [a[0] for a in accepted]
+    if return_details:
+        return x_ray_lines, accepted
+    return x_ray_lines
+
+"""
+Example use:
+sums = processor.reduce_SPD(reductions=('sum',))
+x_ray_lines = identify_lines(sums['sum'])        # e.g. ['O_Ka', 'Si_Ka', 'Cr_Ka', 'Fe_Ka', 'Ni_Ka']
+eds = EDS_Bruker(elements, x_ray_lines)
+"""
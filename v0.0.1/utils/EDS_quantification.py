@@ -0,0 +1,255 @@
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from ..data.k_factors import KFACTORS_HD2700, ATOMIC_WEIGHTS, lookup_kfactors, line_atomic_numbers
+
+def _intensity_stack(intensities):
+    # list of maps (arrays or HyperSpy signals) or (n_lines, rows, columns) array -> array, no copy if possible
+    if isinstance(intensities, np.ndarray):
+        return intensities
+    return np.stack([np.asarray(getattr(m, 'data', m)) for m in intensities])
+
+def _flatten(intensities, x_ray_lines, mask):
+    # -> (n_lines, n_pixels) intensities, flat mask or None, map shape
+    stack = _intensity_stack(intensities)
+    if stack.shape[0] != len(x_ray_lines):
+        raise ValueError(f"{stack.shape[0]} maps for {len(x_ray_lines)} x-ray lines")
+    flat_mask = None if mask is None else np.asarray(mask, dtype=bool).reshape(-1)
+    return stack.reshape(len(x_ray_lines), -1), flat_mask, stack.shape[1:]
+
+def _load_block(flat, flat_mask, p0, p1, dtype, min_counts):
+    # one copy of the block in the working dtype, and which of its pixels are quantified
+    block = flat[:, p0:p1].astype(dtype)
+    np.maximum(block, 0, out=block) # negative background-subtracted counts carry no signal
+    valid = block.sum(axis=0) >= max(min_counts, np.finfo(dtype).tiny)
+    if flat_mask is not None:
+        valid &= flat_mask[p0:p1]
+    return block, valid
+
+def _background_flat(background, n_lines):
+    # optional background counts under each line window -> (n_lines, n_pixels) or None
+    if background is None:
+        return None
+    return _intensity_stack(background).reshape(n_lines, -1)
+
+def _count_variance(block, background, p0, p1, dtype):
+    # Poisson variance of the net line counts: gross (I + B) plus the background estimate (B)
+    if background is None:
+        return block.copy()
+    bg = np.maximum(background[:, p0:p1].astype(dtype), 0)
+    bg *= 2
+    bg += block
+    return bg
+
+def _fraction_sigma(fractions, weighted, variance, factors):
+    """
+    First-order propagation of the count variances through c_i = f_i I_i / S, S = sum_j f_j I_j:
+    with u_j = f_j sigma_j / S,  var(c_i) = u_i^2 (1 - c_i)^2 + c_i^2 (sum_j u_j^2 - u_i^2).
+    weighted is f * I, factors f (per line, or per line and pixel). Returns sigma(c).
+    """
+    u2 = variance
+    u2 *= factors ** 2
+    u2 /= weighted.sum(axis=0) ** 2
+    total = u2.sum(axis=0)
+    var = u2 * (1 - fractions) ** 2 + fractions ** 2 * (total - u2)
+    return np.sqrt(var, out=var)
+
+def _blocks(n_pixels, block_pixels):
+    return [(p0, min(p0 + block_pixels, n_pixels)) for p0 in range(0, n_pixels, block_pixels)]
+
+def _run_blocks(kernel, n_pixels, block_pixels, workers):
+    # kernel(p0, p1) writes its own slice of the outputs; NumPy releases the GIL, so threads scale
+    blocks = _blocks(n_pixels, block_pixels)
+    if workers is None or workers == 1 or len(blocks) == 1:
+        for p0, p1 in blocks:
+            kernel(p0, p1)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda block: kernel(*block), blocks))
+
+def cliff_lorimer_factors(x_ray_lines, kfactors=None, composition_units='atomic', table=KFACTORS_HD2700):
+    """
+    Per-line factors f so that fraction_i = f_i * I_i / sum_j f_j * I_j.
+    Weight fractions use f = k, atomic fractions f = k / A (A = atomic weight).
+    Parameters:
+    - x_ray_lines: e.g. ['Al_Ka', 'O_Ka']
+    - kfactors: optional k-factors in line order (default: looked up in table)
+    - composition_units: 'atomic' or 'weight'
+    - table: (Z, shell) k-factor array, see data.k_factors
+    Returns:
+    - float64 array of factors
+    """
+    if kfactors is None:
+        kfactors = lookup_kfactors(list(x_ray_lines), table)
+    kfactors = np.asarray(kfactors, dtype=np.float64)
+    missing = [line for line, k in zip(x_ray_lines, kfactors) if not k > 0]
+    if missing:
+        raise ValueError(f"No k-factor for {missing}")
+    if composition_units == 'weight':
+        return kfactors
+    if composition_units == 'atomic':
+        return kfactors / ATOMIC_WEIGHTS[line_atomic_numbers(x_ray_lines)]
+    raise ValueError("composition_units must be 'atomic' or 'weight'")
+
+def quantify_maps(intensities, x_ray_lines, kfactors=None, composition_units='atomic', mask=None,
+                  min_counts=0, fill_value=np.nan, dtype=np.float32, block_pixels=2**18, workers=None,
+                  background=None, return_uncertainty=False, table=KFACTORS_HD2700):
+    """
+    Cliff-Lorimer quantification of every pixel at once.
+    The k-factors are folded into one factor per line, then each block of pixels is a single
+    weighted normalisation (one multiply, one sum and one divide per line and pixel).
+    Parameters:
+    - intensities: (n_lines, rows, columns) array, or list of line-intensity maps (arrays or
+                   HyperSpy signals, e.g. from EDS_Bruker.get_line_maps), in x_ray_lines order
+    - x_ray_lines: e.g. ['Al_Ka', 'O_Ka']
+    - kfactors: optional k-factors in line order (default: the HD2700 table)
+    - composition_units: 'atomic' or 'weight' fractions (0..1)
+    - mask: optional boolean (rows, columns) map, False pixels are not quantified
+    - min_counts: pixels whose summed line intensity is below this are not quantified
+    - fill_value: value of pixels not quantified
+    - dtype: output and working dtype (float32 by default)
+    - block_pixels: pixels per block, bounds the working memory to a few blocks
+    - workers: threads working on blocks in parallel (None or 1: no pool)
+    - background: optional background counts under each line window (same layout as intensities),
+                  the intensities being net counts. Only used for the uncertainty
+    - return_uncertainty: also return the 1-sigma counting uncertainty of the fractions, propagated
+                          from the Poisson variance of the line counts (I + 2B) in the same pass
+    - table: (Z, shell) k-factor array, see data.k_factors
+    Returns:
+    - (n_lines, rows, columns) array of fractions [, array of their uncertainties]
+    """
+    flat, flat_mask, shape = _flatten(intensities, x_ray_lines, mask)
+    n_lines = len(x_ray_lines)
+    bg_flat = _background_flat(background, n_lines) if return_uncertainty else None
+    factors = cliff_lorimer_factors(x_ray_lines, kfactors, composition_units, table).astype(dtype)[:, None]
+    out = np.empty((n_lines, flat.shape[1]), dtype=dtype)
+    sigma = np.empty_like(out) if return_uncertainty else None
+
+    def kernel(p0, p1):
+        block, valid = _load_block(flat, flat_mask, p0, p1, dtype, min_counts)
+        if return_uncertainty:
+            variance = _count_variance(block, bg_flat, p0, p1, dtype)
+        block *= factors
+        total = block.sum(axis=0)
+        np.divide(block, total, out=out[:, p0:p1], where=valid)
+        out[:, p0:p1][:, ~valid] = fill_value
+        if return_uncertainty:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sigma[:, p0:p1] = _fraction_sigma(out[:, p0:p1], block, variance, factors)
+            sigma[:, p0:p1][:, ~valid] = fill_value
+
+    _run_blocks(kernel, flat.shape[1], block_pixels, workers)
+    if return_uncertainty:
+        return out.reshape((n_lines,) + shape), sigma.reshape((n_lines,) + shape)
+    return out.reshape((n_lines,) + shape)
+
+@lru_cache(maxsize=64)
+def _mass_absorption_matrix(x_ray_lines):
+    import exspy # element database and mass absorption coefficients, only needed here
+    elements = [line.split('_')[0] for line in x_ray_lines]
+    energies = [exspy.material.elements[element].Atomic_properties.Xray_lines[line.split('_')[1]].energy_keV
+                for element, line in zip(elements, x_ray_lines)]
+    mac = np.array([exspy.material.mass_absorption_coefficient(element, energies) for element in elements]).T
+    mac.flags.writeable = False
+    return mac
+
+def mass_absorption_matrix(x_ray_lines):
+    """
+    Mass absorption coefficients (cm^2/g) mac[i, j] of the element of line j for the x-rays of line i,
+    from the exspy database, cached per line list.
+    """
+    return _mass_absorption_matrix(tuple(x_ray_lines))
+
+def quantify_maps_absorption(intensities, x_ray_lines, mass_thickness, take_off_angle=22.0, kfactors=None,
+                             composition_units='atomic', mac=None, tol=1e-4, max_iterations=30, mask=None,
+                             min_counts=0, fill_value=np.nan, dtype=np.float32, block_pixels=2**18,
+                             workers=None, return_converged=False, background=None, return_uncertainty=False,
+                             table=KFACTORS_HD2700):
+    """
+    Cliff-Lorimer quantification with the thin-film absorption correction, for thicker specimens.
+    Composition and absorption are solved together by fixed-point iteration on every pixel at once:
+        mu_i  = sum_j w_j mac[i, j]                    (specimen absorption of line i)
+        chi_i = mu_i * mass_thickness / sin(take_off_angle)
+        w_i  ~ k_i * I_i * chi_i / (1 - exp(-chi_i))  (normalised to 1)
+    starting from the uncorrected weight fractions. Pixels whose fractions moved by less than tol
+    are marked converged and dropped from the following iterations.
+    Parameters:
+    - intensities, x_ray_lines, kfactors, composition_units, mask, min_counts, fill_value, dtype,
+      block_pixels, workers, background, return_uncertainty, table: as in quantify_maps (one line
+      per element). The uncertainty treats the converged absorption factors as constants
+    - mass_thickness: density * thickness in g/cm^2, scalar or (rows, columns) map
+                      (e.g. 5 g/cm^3 * 100 nm = 5e-5 g/cm^2)
+    - take_off_angle: detector take-off angle in degrees
+    - mac: optional (n_lines, n_lines) mass absorption coefficients in cm^2/g, see mass_absorption_matrix
+    - tol: convergence threshold on the weight fractions
+    - max_iterations: pixels still moving after this many iterations keep their last estimate
+    - return_converged: also return the boolean (rows, columns) convergence map
+    Returns:
+    - (n_lines, rows, columns) array of fractions [, uncertainties] [, convergence map]
+    """
+    elements = [line.split('_')[0] for line in x_ray_lines]
+    if len(set(elements)) != len(elements):
+        raise ValueError("Absorption correction needs one x-ray line per element")
+    flat, flat_mask, shape = _flatten(intensities, x_ray_lines, mask)
+    n_lines, n_pixels = flat.shape
+    kfactors = cliff_lorimer_factors(x_ray_lines, kfactors, 'weight', table).astype(dtype)[:, None]
+    mac = mass_absorption_matrix(x_ray_lines) if mac is None else np.asarray(mac)
+    mac = mac.astype(dtype)
+    if composition_units == 'atomic':
+        to_atomic = (1 / ATOMIC_WEIGHTS[line_atomic_numbers(x_ray_lines)]).astype(dtype)[:, None]
+    elif composition_units != 'weight':
+        raise ValueError("composition_units must be 'atomic' or 'weight'")
+    # path length factor folded into the mass thickness
+    rho_t = np.broadcast_to(np.asarray(mass_thickness, dtype=dtype), shape).reshape(-1)
+    rho_t = rho_t / np.asarray(np.sin(np.radians(take_off_angle)), dtype=dtype)
+    bg_flat = _background_flat(background, n_lines) if return_uncertainty else None
+    out = np.empty((n_lines, n_pixels), dtype=dtype)
+    sigma = np.empty_like(out) if return_uncertainty else None
+    converged_map = np.zeros(n_pixels, dtype=bool)
+
+    def absorption_factors(w, path):
+        chi = (mac @ w) * path
+        acf = np.ones_like(chi)
+        np.divide(chi, -np.expm1(-chi), out=acf, where=chi > 1e-6) # -> 1 when chi -> 0
+        return acf
+
+    def kernel(p0, p1):
+        block, valid = _load_block(flat, flat_mask, p0, p1, dtype, min_counts)
+        pixels = np.flatnonzero(valid)
+        ki = block[:, pixels] * kfactors # k_i * I_i of the quantified pixels
+        w = ki / ki.sum(axis=0)
+        path = rho_t[p0:p1][pixels]
+        active = np.arange(len(pixels)) # positions (in pixels) still iterating
+        for _ in range(max_iterations):
+            if len(active) == 0:
+                break
+            w_new = ki[:, active] * absorption_factors(w[:, active], path[active])
+            w_new /= w_new.sum(axis=0)
+            done = np.abs(w_new - w[:, active]).max(axis=0) < tol
+            w[:, active] = w_new
+            converged_map[p0 + pixels[active[done]]] = True
+            active = active[~done]
+        if return_uncertainty:
+            # per-pixel factors of the converged solution: f = k * acf (/ A), w = f I / sum f I
+            factors = kfactors * absorption_factors(w, path)
+        if composition_units == 'atomic':
+            w *= to_atomic
+            w /= w.sum(axis=0)
+        out[:, p0:p1] = fill_value
+        out[:, p0 + pixels] = w
+        if return_uncertainty:
+            if composition_units == 'atomic':
+                factors *= to_atomic
+            intensity = block[:, pixels]
+            variance = _count_variance(intensity, None if bg_flat is None else bg_flat[:, p0:p1][:, pixels],
+                                       0, len(pixels), dtype)
+            sigma[:, p0:p1] = fill_value
+            sigma[:, p0 + pixels] = _fraction_sigma(w, intensity * factors, variance, factors)
+
+    _run_blocks(kernel, n_pixels, block_pixels, workers)
+    results = (out.reshape((n_lines,) + shape),)
+    if return_uncertainty:
+        results += (sigma.reshape((n_lines,) + shape),)
+    if return_converged:
+        results += (converged_map.reshape(shape),)
+    return results[0] if len(results) == 1 else results
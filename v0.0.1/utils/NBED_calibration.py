@@ -1,50 +1,106 @@
 import numpy as np
-import pyxem as pxm
-import hyperspy.api as hs
-from pyxem.libraries.calibration_library import CalibrationDataLibrary
-from pyxem.generators.calibration_generator import CalibrationGenerator
+from .._lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+# camera length -> calibration (1/nm per pixel) of each microscope
+NBED_F30 = {
+    200:0.2345746633560363,
+    250:0.1862625415225771,
+    300:0.1562169503514413,
+    380:0.1225684262753367,
+    580:0.0829012794983478,
+    750:0.0621134215923645,
+    1000:0.0463765534986008,
+    1200:0.0385675398614808,
+    1500:0.0304885392056699,
+    2000:0.022962175785559,
+    3000:0.0153784852837892,
+    4500:0.0101846964140601
+}
+NBED_HD2700 = {
+    1:0.268622,
+    1.049:0.214803,
+    1.1:0.175866,
+    1.149:0.150919,
+    1.2:0.129091,
+    1.251:0.11219,
+    1.3:0.09901,
+    1.351:0.089018,
+    1.4:0.079783,
+    1.451:0.072484,
+    1.5:0.066695,
+    1.551:0.061213,
+    1.6:0.056804,
+    1.651:0.052335,
+    1.699:0.048822,
+    1.751:0.045686,
+    1.8:0.04286,
+    1.851:0.040391,
+    1.881:0.039397,
+    1.951:0.03637,
+    2:0.03413
+}
+
+# microscope -> (calibration table, camera length matching tolerance)
+# F30 camera lengths must match exactly, HD2700 ones are matched within 0.01
+CALIBRATION_TABLES = {
+    'F30': (NBED_F30, 1e-9),
+    'HD2700': (NBED_HD2700, 0.01),
+}
+
+_SORTED = {}
+
+def _sorted_table(EM_type):
+    # camera lengths ascending and their calibrations, built once per microscope
+    cached = _SORTED.get(EM_type)
+    if cached is None:
+        table, tolerance = CALIBRATION_TABLES[EM_type]
+        lengths = np.array(sorted(table), dtype=np.float64)
+        units = np.array([table[key] for key in sorted(table)], dtype=np.float64)
+        cached = _SORTED[EM_type] = (lengths, units, tolerance)
+    return cached
+
+def _set_calibration(signal, nbed_units):
+    # the diffraction pattern axes, i.e. the signal axes (axes 0 and 1 only for a single pattern)
+    for axis in signal.axes_manager.signal_axes[:2]:
+        axis.units = '/nm'
+        axis.scale = nbed_units
+
+def lookup_calibration(camera_lengths, EM_type, interpolate=False):
+    """
+    Calibrations of camera lengths with a binary search in the sorted table of the microscope.
+    Parameters:
+    - camera_lengths: scalar or array
+    - EM_type: 'F30' or 'HD2700' (a key of CALIBRATION_TABLES)
+    - interpolate: camera lengths between two calibrated ones get a calibration interpolated
+                   linearly in log(camera length) / log(calibration) (the scale follows a power of the length)
+    Returns:
+    - (calibrations, how): float arrays shaped like camera_lengths, nan where unresolved,
+      and 'exact' / 'interpolated' / '' for each
+    """
+    lengths, units, tolerance = _sorted_table(EM_type)
+    cl = np.atleast_1d(np.asarray(camera_lengths, dtype=np.float64))
+    right = np.clip(np.searchsorted(lengths, cl), 0, len(lengths) - 1)
+    left = np.clip(right - 1, 0, len(lengths) - 1)
+    nearest = np.where(np.abs(lengths[left] - cl) <= np.abs(lengths[right] - cl), left, right)
+    exact = np.abs(lengths[nearest] - cl) < tolerance
+    result = np.where(exact, units[nearest], np.nan)
+    how = np.where(exact, 'exact', '').astype('U12')
+    if interpolate:
+        inside = ~exact & (cl > lengths[0]) & (cl < lengths[-1])
+        result[inside] = np.exp(np.interp(np.log(cl[inside]), np.log(lengths), np.log(units)))
+        how[inside] = 'interpolated'
+    if np.ndim(camera_lengths) == 0:
+        return float(result[0]), str(how[0])
+    return result, how
 
 class NBED_calibration:
     def __init__(self,NBED_data, EM_type =None):
         self.s = NBED_data
         self.EM_type = EM_type
-        self.NBED_F30={
-            200:0.2345746633560363,
-            250:0.1862625415225771,
-            300:0.1562169503514413,
-            380:0.1225684262753367,
-            580:0.0829012794983478,
-            750:0.0621134215923645,
-            1000:0.0463765534986008,
-            1200:0.0385675398614808,
-            1500:0.0304885392056699,
-            2000:0.022962175785559,
-            3000:0.0153784852837892,
-            4500:0.0101846964140601
-            }
-        self.NBED_HD2700={
-            1:0.268622,
-            1.049:0.214803,
-            1.1:0.175866,
-            1.149:0.150919,
-            1.2:0.129091,
-            1.251:0.11219,
-            1.3:0.09901,
-            1.351:0.089018,
-            1.4:0.079783,
-            1.451:0.072484,
-            1.5:0.066695,
-            1.551:0.061213,
-            1.6:0.056804,
-            1.651:0.052335,
-            1.699:0.048822,
-            1.751:0.045686,
-            1.8:0.04286,
-            1.851:0.040391,
-            1.881:0.039397,
-            1.951:0.03637,
-            2:0.03413
-            }
+        self.NBED_F30 = NBED_F30
+        self.NBED_HD2700 = NBED_HD2700
     def calibration(self):
         try:
             # Determine microscope type
@@ -61,31 +117,15 @@ class NBED_calibration:
             camera_length = self.s.metadata.Acquisition_instrument.TEM.camera_length
             print(f'Camera length = {camera_length} mm')
             
-            # Calibration for F30 microscope
-            if self.EM_type == 'F30':
-                for key, value in self.NBED_F30.items():
-                    if camera_length == int(key):
-                        nbed_units = value
-                        print(f'Calibration units: {nbed_units}')
-                        break
-                else:
-                    raise ValueError(f"No calibration found for camera length {camera_length}")
-            
-            # Calibration for HD2700 microscope
-            elif self.EM_type == 'HD2700':
-                for key, value in self.NBED_HD2700.items():
-                    if abs(camera_length - key) < 0.01:
-                        nbed_units = value
-                        print(f'Using calibration {nbed_units} for camera length {key}')
-                        break
-                else:
+            # Calibration of the microscope, binary search in its camera length table
+            if self.EM_type in CALIBRATION_TABLES:
+                nbed_units, _ = lookup_calibration(camera_length, self.EM_type)
+                if np.isnan(nbed_units):
                     raise ValueError(f"No calibration found for camera length {camera_length}")
+                print(f'Calibration units: {nbed_units}')
             
             # Set axis scales
-            self.s.axes_manager[0].units = '/nm'
-            self.s.axes_manager[0].scale = nbed_units
-            self.s.axes_manager[1].units = '/nm'
-            self.s.axes_manager[1].scale = nbed_units
+            _set_calibration(self.s, nbed_units)
             
             #return nbed_units
         
@@ -94,21 +134,85 @@ class NBED_calibration:
             camera_length = float(input("Please enter camera length (CL) for HD2700: "))
             print(f'CL of HD2700 = {camera_length} Å')
             
-            for key, value in self.NBED_HD2700.items():
-                if abs(camera_length - key) < 0.01:
-                    nbed_units = value
-                    print(f'Using calibration {nbed_units} for camera length {key}')
-                    
-                    # Set axis scales
-                    self.s.axes_manager[0].units = '/nm'
-                    self.s.axes_manager[0].scale = nbed_units
-                    self.s.axes_manager[1].units = '/nm'
-                    self.s.axes_manager[1].scale = nbed_units
-                    
-                    #return nbed_units
-            
-            print('Sorry, this camera length is out of the calibrated range')
+            nbed_units, _ = lookup_calibration(camera_length, 'HD2700')
+            if np.isnan(nbed_units):
+                print('Sorry, this camera length is out of the calibrated range')
+            else:
+                print(f'Using calibration {nbed_units} for camera length {camera_length}')
+
+                # Set axis scales
+                _set_calibration(self.s, nbed_units)
+
+                #return nbed_units
         return self.s
+
+def calibrate_batch(datasets, EM_type=None, camera_lengths=None, interpolate=False, default_EM_type='F30'):
+    """
+    Calibrate many NBED datasets without any prompt: camera lengths are read from the metadata,
+    looked up in the sorted tables all at once per microscope, and datasets that cannot be
+    calibrated are reported instead of asking for input.
+    Parameters:
+    - datasets: a signal, or a (nested) list of signals (e.g. what hs.load returns for one or several
+                files; survey and ROI images without a camera length are simply reported)
+    - EM_type: microscope of every dataset, by default the metadata microscope, else default_EM_type
+    - camera_lengths: optional camera length per dataset (list, or dict index -> value) used when
+                      the metadata has none
+    - interpolate: interpolate between calibrated camera lengths (see lookup_calibration)
+    Returns:
+    - calibrated: list of the calibrated signals (signal axes set in /nm, in place)
+    - report: DataFrame with one row per dataset: index, title, EM_type, camera_length,
+              calibration, match ('exact' / 'interpolated'), error (None when calibrated)
+    """
+    if not isinstance(datasets, (list, tuple)):
+        datasets = [datasets]
+    # hs.load of several files gives one list per file: flatten, the report indexes the flat list
+    while any(isinstance(s, (list, tuple)) for s in datasets):
+        datasets = [d for s in datasets for d in (s if isinstance(s, (list, tuple)) else [s])]
+    if camera_lengths is not None and not isinstance(camera_lengths, dict):
+        camera_lengths = dict(enumerate(camera_lengths))
+    camera_lengths = camera_lengths or {}
+
+    rows = []
+    for i, s in enumerate(datasets):
+        metadata = getattr(s, 'metadata', None)
+        get = metadata.get_item if metadata is not None else (lambda path: None)
+        em = EM_type or get('Acquisition_instrument.TEM.microscope') or default_EM_type
+        cl = get('Acquisition_instrument.TEM.camera_length')
+        if cl is None:
+            cl = camera_lengths.get(i)
+        title = get('General.title')
+        error = None
+        if getattr(s, 'axes_manager', None) is None or len(s.axes_manager.signal_axes) < 2:
+            error = 'not a 2D diffraction signal'
+        elif cl is None:
+            error = 'no camera length in the metadata'
+        elif em not in CALIBRATION_TABLES:
+            error = f"no calibration table for microscope '{em}'"
+        rows.append({'index': i, 'title': title, 'EM_type': em, 'camera_length': cl,
+                     'calibration': np.nan, 'match': '', 'error': error})
+
+    # one vectorized lookup per microscope
+    for em in CALIBRATION_TABLES:
+        todo = [row for row in rows if row['error'] is None and row['EM_type'] == em]
+        if not todo:
+            continue
+        units, how = lookup_calibration([row['camera_length'] for row in todo], em, interpolate)
+        for row, value, match in zip(todo, units, how):
+            if np.isnan(value):
+                row['error'] = f"camera length {row['camera_length']} is out of the calibrated range"
+            else:
+                row['calibration'], row['match'] = float(value), str(match)
+
+    calibrated = []
+    for row in rows:
+        if row['error'] is not None:
+            print(f"Not calibrated: dataset {row['index']} ({row['title']}): {row['error']}")
+            continue
+        s = datasets[row['index']]
+        _set_calibration(s, row['calibration'])
+        calibrated.append(s)
+    report = pd.DataFrame(rows, columns=['index', 'title', 'EM_type', 'camera_length', 'calibration', 'match', 'error'])
+    return calibrated, report
 """
 Example use:
 file_name = your NBED data
@@ -116,4 +220,7 @@ NBED_data = hs.load(file_name, 'F30')
 SI = NBED_data[2] (be careful to select NBED SI only. NBED_data file might be a list which contains survery image, ROI image and SI data)
 SI=SI.calibration()
 SI.plot()
+For unattended jobs (no prompt, unresolved datasets listed in the report):
+calibrated, report = calibrate_batch(hs.load(file_names), interpolate=True)
+report[report.error.notna()]
 """
\ No newline at end of file
@@ -1,2 +1,22 @@
-from .EDAX_EDS_loader import HDF5SignalProcessor
-from .NBED_calibration import NBED_calibration
\ No newline at end of file
+from .._lazy import lazy_getattr
+# eager: the class has the name of its submodule, which the import system binds on the package
+# once the submodule is loaded; NBED_calibration only needs numpy
+from .NBED_calibration import NBED_calibration
+
+_EXPORTS = {
+    'HDF5SignalProcessor': '.EDAX_EDS_loader',
+    'load_batch': '.EDAX_EDS_loader',
+    'scan_files': '.EDAX_EDS_loader',
+    'EDAXCache': '.EDAX_EDS_cache',
+    'calibrate_batch': '.NBED_calibration',
+    'lookup_calibration': '.NBED_calibration',
+    'quantify_maps': '.EDS_quantification',
+    'quantify_maps_absorption': '.EDS_quantification',
+    'identify_lines': '.EDS_peak_id',
+}
+
+def __getattr__(name):
+    return lazy_getattr(__name__, name, _EXPORTS)
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
\ No newline at end of file